@@ -0,0 +1,69 @@
+'''Tracks how long importing Bolt takes and that heavy libraries stay out of it
+
+python3 benchmarks/startup.py --runs 10 --limit 400 --output startup.jsonl
+'''
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+heavy = ['numpy', 'scipy', 'fuzzywuzzy', 'Levenshtein']  # loaded only when used
+
+
+def importTimes(module):
+    '''Cumulative microseconds every module took to import, from -X importtime'''
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True).stderr
+    times = {}
+    for line in output.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)', line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+def loaded(module):
+    '''Heavy libraries that importing module pulled in'''
+    code = 'import sys, %s; print(" ".join(sys.modules))' % module
+    output = subprocess.run([sys.executable, '-c', code], cwd=root,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    modules = set(output.split())
+    return [name for name in heavy if name in modules]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--module', help='module to import', default='bolt')
+    parser.add_argument('--runs', help='imports to take the median of', type=int, default=5)
+    parser.add_argument('--limit', help='fail above this many milliseconds', type=float)
+    parser.add_argument('--output', help='append the result to this jsonl file')
+    args = parser.parse_args()
+
+    runs = [importTimes(args.module) for i in range(args.runs)]
+    median = statistics.median(run[args.module] for run in runs) / 1000
+    slowest = sorted(runs[-1].items(), key=lambda item: -item[1])[1:11]
+    leaked = loaded(args.module)
+
+    print('import %s: %.1fms (median of %i)' % (args.module, median, args.runs))
+    for name, spent in slowest:
+        print('    %-40s %8.1fms' % (name, spent / 1000))
+    if leaked:
+        print('loaded at import time: %s' % ', '.join(leaked))
+    if args.output:
+        with open(args.output, 'a') as output:
+            output.write(json.dumps({'time': time.time(), 'module': args.module,
+                                     'milliseconds': median, 'loaded': leaked}) + '\n')
+    if leaked or (args.limit and median > args.limit):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
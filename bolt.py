@@ -1,6 +1,25 @@
+import argparse
+import concurrent.futures
+import json
+import sys
+import time
+
+import core.config
 from core.colors import green, yellow, end, run, good, info, bad, white, red
+from core.prompt import prompt
+from core.encoder import modes
+from core.limiter import setConcurrency, settled
+from core.requester import setPoolSize
+from core.scanner import Scanner
+from core import stats
+from core.utils import extractHeaders
 
 lightning = '\033[93;5m⚡\033[0m'
+messages = {
+    'remove': 'without CSRF token parameter',
+    'clear': 'without CSRF token parameter value',
+    'generate': 'with a self generated token',
+}
 
 
 def banner():
@@ -9,349 +28,316 @@ def banner():
     ''' % (yellow, white, yellow, end))
 
 
-banner()
-
-try:
-    import concurrent.futures
-    from pathlib import Path
-except:
-    print ('%s Bolt is not compatible with python 2. Please run it with python 3.' % bad)
-
-try:
-    from fuzzywuzzy import fuzz, process
-except:
-    import os
-    print ('%s fuzzywuzzy library is not installed, installing now.' % info)
-    os.system('pip3 install fuzzywuzzy')
-    print ('%s fuzzywuzzy has been installed, please restart Bolt.' % info)
-    quit()
-
-import argparse
-import json
-import random
-import re
-import statistics
-
-from core.entropy import isRandom
-from core.datanize import datanize
-from core.prompt import prompt
-from core.photon import photon
-from core.tweaker import tweaker
-from core.evaluate import evaluate
-from core.ranger import ranger
-from core.zetanize import zetanize
-from core.requester import requester
-from core.utils import extractHeaders, strength, isProtected, stringToBinary, longestCommonSubstring
-
-parser = argparse.ArgumentParser()
-parser.add_argument('-u', help='target url', dest='target')
-parser.add_argument('-t', help='number of threads', dest='threads', type=int)
-parser.add_argument('-l', help='levels to crawl', dest='level', type=int)
-parser.add_argument('--delay', help='delay between requests',
-                    dest='delay', type=int)
-parser.add_argument('--timeout', help='http request timeout',
-                    dest='timeout', type=int)
-parser.add_argument('--headers', help='http headers',
-                    dest='add_headers', nargs='?', const=True)
-args = parser.parse_args()
-
-if not args.target:
-    print('\n' + parser.format_help().lower())
-    quit()
-
-if type(args.add_headers) == bool:
-    headers = extractHeaders(prompt())
-elif type(args.add_headers) == str:
-    headers = extractHeaders(args.add_headers)
-else:
-    from core.config import headers
-
-target = args.target
-delay = args.delay or 0
-level = args.level or 2
-timeout = args.timeout or 20
-threadCount = args.threads or 2
-
-allTokens = []
-weakTokens = []
-tokenDatabase = []
-insecureForms = []
-
-print (' %s Phase: Crawling %s[%s1/6%s]%s' %
-       (lightning, green, end, green, end))
-dataset = photon(target, headers, level, threadCount)
-allForms = dataset[0]
-print ('\r%s Crawled %i URL(s) and found %i form(s).%-10s' %
-       (info, dataset[1], len(allForms), ' '))
-print (' %s Phase: Evaluating %s[%s2/6%s]%s' %
-       (lightning, green, end, green, end))
-
-evaluate(allForms, weakTokens, tokenDatabase, allTokens, insecureForms)
-
-if weakTokens:
-    print ('%s Weak token(s) found' % good)
-    for weakToken in weakTokens:
-        url = list(weakToken.keys())[0]
-        token = list(weakToken.values())[0]
-        print ('%s %s %s' % (info, url, token))
-
-if insecureForms:
-    print ('%s Insecure form(s) found' % good)
-    for insecureForm in insecureForms:
-        url = list(insecureForm.keys())[0]
-        action = list(insecureForm.values())[0]['action']
-        form = action.replace(target, '')
-        if form:
-            print ('%s %s %s[%s%s%s]%s' %
-                   (bad, url, green, end, form, green, end))
-
-print (' %s Phase: Comparing %s[%s3/6%s]%s' %
-       (lightning, green, end, green, end))
-uniqueTokens = set(allTokens)
-if len(uniqueTokens) < len(allTokens):
-    print ('%s Potential Replay Attack condition found' % good)
-    print ('%s Verifying and looking for the cause' % run)
-    replay = False
-    for each in tokenDatabase:
-        url, token = next(iter(each.keys())), next(iter(each.values()))
-        for each2 in tokenDatabase:
-            url2, token2 = next(iter(each2.keys())), next(iter(each2.values()))
-            if token == token2 and url != url2:
-                print ('%s The same token was used on %s%s%s and %s%s%s' %
-                       (good, green, url, end, green, url2, end))
-                replay = True
-    if not replay:
-        print ('%s Further investigation shows that it was a false positive.')
-
-p = Path(__file__).parent.joinpath('db/hashes.json')
-with p.open('r') as f:
-    hashPatterns = json.load(f)
-
-if not allTokens:
-    print ('%s No CSRF protection to test' % bad)
-    quit()
-
-aToken = allTokens[0]
-matches = []
-for element in hashPatterns:
-    pattern = element['regex']
-    if re.match(pattern, aToken):
-        for name in element['matches']:
-            matches.append(name)
-if matches:
-    print ('%s Token matches the pattern of following hash type(s):' % info)
-    for name in matches:
-        print ('    %s>%s %s' % (yellow, end, name))
-
-
-def fuzzy(tokens):
-    averages = []
-    for token in tokens:
-        sameTokenRemoved = False
-        result = process.extract(token, tokens, scorer=fuzz.partial_ratio)
-        scores = []
-        for each in result:
-            score = each[1]
-            if score == 100 and not sameTokenRemoved:
-                sameTokenRemoved = True
-                continue
-            scores.append(score)
-        average = statistics.mean(scores)
-        averages.append(average)
-    return statistics.mean(averages)
-
-
-try:
-    similarity = fuzzy(allTokens)
-    print ('%s Tokens are %s%i%%%s similar to each other on an average' %
-           (info, green, similarity, end))
-except statistics.StatisticsError:
-    print ('%s No CSRF protection to test' % bad)
-    quit()
-
-
-def staticParts(allTokens):
-    strings = list(set(allTokens.copy()))
-    commonSubstrings = {}
-    for theString in strings:
-        strings.remove(theString)
-        for string in strings:
-            commonSubstring = longestCommonSubstring(theString, string)
-            if commonSubstring not in commonSubstrings:
-                commonSubstrings[commonSubstring] = []
-            if len(commonSubstring) > 2:
-                if theString not in commonSubstrings[commonSubstring]:
-                    commonSubstrings[commonSubstring].append(theString)
-                if string not in commonSubstrings[commonSubstring]:
-                    commonSubstrings[commonSubstring].append(string)
-    return commonSubstrings
-
-
-result = {k: v for k, v in staticParts(allTokens).items() if v}
-
-if result:
-    print ('%s Common substring found' % info)
-    print (json.dumps(result, indent=4))
-
-simTokens = []
-
-print (' %s Phase: Observing %s[%s4/6%s]%s' %
-       (lightning, green, end, green, end))
-print ('%s 100 simultaneous requests are being made, please wait.' % info)
-
-
-def extractForms(url):
-    response = requester(url, {}, headers, True, 0).text
-    forms = zetanize(url, response)
-    for each in forms.values():
-        localTokens = set()
-        inputs = each['inputs']
-        for inp in inputs:
-            value = inp['value']
-            if value and re.match(r'^[\w\-_]+$', value):
-                if strength(value) > 10:
-                    simTokens.append(value)
-
-
-while True:
-    sample = random.choice(tokenDatabase)
-    goodToken = list(sample.values())[0]
-    if len(goodToken) > 0:
-        goodCandidate = list(sample.keys())[0]
-        break
-
-threadpool = concurrent.futures.ThreadPoolExecutor(max_workers=30)
-futures = (threadpool.submit(extractForms, goodCandidate)
-           for goodCandidate in [goodCandidate] * 30)
-for i in concurrent.futures.as_completed(futures):
-    pass
-
-if simTokens:
-    if len(set(simTokens)) < len(simTokens):
-        print ('%s Same tokens were issued for simultaneous requests.' % good)
-    else:
-        print (simTokens)
-else:
-    print ('%s Different tokens were issued for simultaneous requests.' % info)
-
-print (' %s Phase: Testing %s[%s5/6%s]%s' %
-       (lightning, green, end, green, end))
-
-parsed = ''
-found = False
-print ('%s Finding a suitable form for further testing. It may take a while.' % run)
-for form_dict in allForms:
-    for url, forms in form_dict.items():
-        parsed = datanize(forms, tolerate=True)
-        if parsed:
-            found = True
-            break
-    if found:
-        break
-
-if not parsed:
-    quit('%s No suitable form found for testing.' % bad)
-
-origGET = parsed[0]
-origUrl = parsed[1]
-origData = parsed[2]
-
-print ('%s Making a request with CSRF token for comparison.' % run)
-response = requester(origUrl, origData, headers, origGET, 0)
-originalCode = response.status_code
-originalLength = len(response.text)
-print ('%s Status Code: %s' % (info, originalCode))
-print ('%s Content Length: %i' % (info, originalLength))
-print ('%s Checking if the resonse is dynamic.' % run)
-response = requester(origUrl, origData, headers, origGET, 0)
-secondLength = len(response.text)
-if originalLength != secondLength:
-    print ('%s Response is dynamic.' % info)
-    tolerableDifference = abs(originalLength - secondLength)
-else:
-    print ('%s Response isn\'t dynamic.' % info)
-    tolerableDifference = 0
-
-print ('%s Emulating a mobile browser' % run)
-print ('%s Making a request with mobile browser' % run)
-headers['User-Agent'] = 'Mozilla/4.0 (compatible; MSIE 5.5; Windows CE; PPC; 240x320)'
-response = requester(origUrl, {}, headers, True, 0).text
-parsed = zetanize(origUrl, response)
-if isProtected(parsed):
-    print ('%s CSRF protection is enabled for mobile browsers as well.' % bad)
-else:
-    print ('%s CSRF protection isn\'t enabled for mobile browsers.' % good)
-
-print ('%s Making a request without CSRF token parameter.' % run)
-
-data = tweaker(origData, 'remove')
-response = requester(origUrl, data, headers, origGET, 0)
-if response.status_code == originalCode:
-    if str(originalCode)[0] in ['4', '5']:
-        print ('%s It didn\'t work' % bad)
+def argumentParser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-u', help='target url', dest='target')
+    parser.add_argument('--targets', help='file with a target url per line, - for stdin',
+                        dest='targets')
+    parser.add_argument('--workers', help='targets scanned at once in batch mode',
+                        dest='workers', type=int, default=4)
+    parser.add_argument('-o', help='file the jsonl results of batch mode are appended to',
+                        dest='output')
+    parser.add_argument('-t', help='number of threads', dest='threads', type=int)
+    parser.add_argument('-l', help='levels to crawl', dest='level', type=int)
+    parser.add_argument('--delay', help='delay between requests',
+                        dest='delay', type=int)
+    parser.add_argument('--timeout', help='http request timeout',
+                        dest='timeout', type=int)
+    parser.add_argument('--rate', help='requests per second per host',
+                        dest='rate', type=float)
+    parser.add_argument('--burst', help='requests per host allowed in a burst',
+                        dest='burst', type=int)
+    parser.add_argument('--retries', help='retries for failed requests',
+                        dest='retries', type=int)
+    parser.add_argument('--max-size', help='maximum response size to parse, in bytes',
+                        dest='max_size', type=int)
+    parser.add_argument('--budget', help='requests the observing phase can make',
+                        dest='budget', type=int)
+    parser.add_argument('--encoding', help='how tokens are turned into bits',
+                        dest='encoding', choices=modes, default='auto')
+    parser.add_argument('--headers', help='http headers',
+                        dest='add_headers', nargs='?', const=True)
+    parser.add_argument('--stats', help='print timings, requests and latencies',
+                        dest='stats', action='store_true')
+    parser.add_argument('--stats-json', help='dump the metrics to a json file',
+                        dest='stats_json')
+    parser.add_argument('--prometheus', help='write the metrics to a prometheus textfile',
+                        dest='prometheus')
+    return parser
+
+
+def configure(args):
+    """Applies the options that are shared by every scan of this process"""
+    threadCount = args.threads or 10
+    setPoolSize(max(threadCount, core.config.maxConcurrency))
+    setConcurrency(threadCount)
+    core.config.timeout = args.timeout or 20
+    if args.rate:
+        core.config.rate = args.rate
+    elif args.delay:
+        core.config.rate = 1 / args.delay
+    if args.burst:
+        core.config.burst = args.burst
+    if args.retries is not None:
+        core.config.retries = args.retries
+    if args.max_size:
+        core.config.maxSize = args.max_size
+    if type(args.add_headers) == bool:
+        return extractHeaders(prompt())
+    elif type(args.add_headers) == str:
+        return extractHeaders(args.add_headers)
+    return dict(core.config.headers)
+
+
+def phase(name, number):
+    print (' %s Phase: %s %s[%s%i/6%s]%s' %
+           (lightning, name, green, end, number, green, end))
+
+
+def showEvaluation(result):
+    if result.weakTokens:
+        print ('%s Weak token(s) found' % good)
+        for weakToken in result.weakTokens:
+            url = list(weakToken.keys())[0]
+            token = list(weakToken.values())[0]
+            print ('%s %s %s' % (info, url, token))
+    if result.insecureForms:
+        print ('%s Insecure form(s) found' % good)
+        for insecureForm in result.insecureForms:
+            url = list(insecureForm.keys())[0]
+            action = list(insecureForm.values())[0]['action']
+            form = action.replace(result.target, '')
+            if form:
+                print ('%s %s %s[%s%s%s]%s' %
+                       (bad, url, green, end, form, green, end))
+
+
+def showComparison(result):
+    if result.replays:
+        print ('%s Potential Replay Attack condition found' % good)
+        for token, urls in result.replays.items():
+            print ('%s The same token was used on %s' %
+                   (good, ' and '.join(green + url + end for url in urls)))
+    if result.stopped:
+        return
+    if result.hashTypes:
+        print ('%s Tokens match the pattern of following hash type(s):' % info)
+        for name, count in result.hashTypes:
+            print ('    %s>%s %s %s(%i/%i)%s' %
+                   (yellow, end, name, green, count, result.tokens, end))
+    score, error = result.similarity['score'], result.similarity['error']
+    if error:
+        print ('%s Tokens are %s%i%%%s (±%.1f) similar to each other on an average' %
+               (info, green, score, end, error))
     else:
-        difference = abs(originalLength - len(response.text))
-        if difference <= tolerableDifference:
-            print ('%s It worked!' % good)
-else:
-    print ('%s It didn\'t work' % bad)
-
-print ('%s Making a request without CSRF token parameter value.' % run)
-data = tweaker(origData, 'clear')
-
-response = requester(origUrl, data, headers, origGET, 0)
-if response.status_code == originalCode:
-    if str(originalCode)[0] in ['4', '5']:
-        print ('%s It didn\'t work' % bad)
-    else:
-        difference = abs(originalLength - len(response.text))
-        if difference <= tolerableDifference:
-            print ('%s It worked!' % good)
-else:
-    print ('%s It didn\'t work' % bad)
-
-
-seeds = ranger(allTokens)
-
-print ('%s Checking if tokens are checked to a specific length' % run)
-
-for index in range(len(allTokens[0])):
-    data = tweaker(origData, 'replace', index=index, seeds=seeds)
-    response = requester(origUrl, data, headers, origGET, 0)
-    if response.status_code == originalCode:
-        if str(originalCode)[0] in ['4', '5']:
-            break
+        print ('%s Tokens are %s%i%%%s similar to each other on an average' %
+               (info, green, score, end))
+    if result.commonSubstrings:
+        print ('%s Common substring found' % info)
+        print (json.dumps(result.commonSubstrings, indent=4))
+    streaming = result.streaming
+    if streaming['verdict'] == 'non-random':
+        print ('%s Tokens are already %snon-random%s (%s, p=%.2g)' %
+               (good, green, end, streaming['test'], streaming['pvalue']))
+
+
+def showSample(sample):
+    print ('%s Made %i request(s) and collected %i fresh token(s)' %
+           (info, sample['requests'], sample['tokens']))
+    if sample['spread'] is not None:
+        print ('%s Requests of a batch were released within %.2fms of each other' %
+               (info, sample['spread']))
+    buckets = sample['histogram']
+    if buckets:
+        print ('%s Response times:' % info)
+        most = max(count for low, high, count in buckets)
+        for low, high, count in buckets:
+            print ('    %s>%s %7.1f - %7.1fms %s%s%s %i' %
+                   (yellow, end, low, high, green, '#' * (30 * count // most), end, count))
+    if sample['collisions']:
+        print ('%s Same tokens were issued for simultaneous requests.' % good)
+    elif sample['tokens']:
+        print ('%s Different tokens were issued for simultaneous requests.' % info)
+
+
+def showTest(test):
+    print ('%s %s %s %s(found on %s)%s' %
+           (info, test['method'], test['url'], green, test['page'], end))
+    baseline = test['baseline']
+    if not baseline:
+        print ('    %s>%s Couldn\'t be requested: %s' %
+               (yellow, end, test['errors'].get('baseline')))
+        return
+    print ('    %s>%s Status Code: %s, Content Length: %i-%i, %s' %
+           (yellow, end, ', '.join(str(code) for code in baseline['codes']),
+            baseline['lengths'][0], baseline['lengths'][1],
+            'dynamic' if baseline['dynamic'] else 'not dynamic'))
+    verdicts = test['verdicts']
+    for case in ['mobile', 'remove', 'clear', 'generate', 'probe']:
+        if case in test['errors']:
+            print ('    %s>%s %s failed: %s' % (yellow, end, case, test['errors'][case]))
+        elif case == 'mobile':
+            if verdicts[case]:
+                print ('    %s CSRF protection isn\'t enabled for mobile browsers.' % good)
+            else:
+                print ('    %s CSRF protection is enabled for mobile browsers as well.' % bad)
+        elif case == 'probe':
+            unchecked, probes = verdicts[case]
+            if unchecked:
+                print ('    %s Last %i chars of token aren\'t being checked (%i requests)' %
+                       (good, unchecked, probes))
+            else:
+                print ('    %s Tokens are checked to their full length (%i requests)' %
+                       (bad, probes))
+        elif verdicts[case]:
+            print ('    %s A request %s worked!' % (good, messages[case]))
         else:
-            difference = abs(originalLength - len(response.text))
-            if difference <= tolerableDifference:
-                print ('%s Last %i chars of token aren\'t being checked' %
-                       (good, index + 1))
-    else:
-        break
-
-print ('%s Generating a fake token.' % run)
-
-data = tweaker(origData, 'generate', seeds=seeds)
-print ('%s Making a request with the self generated token.' % run)
-
-response = requester(origUrl, data, headers, origGET, 0)
-if response.status_code == originalCode:
-    if str(originalCode)[0] in ['4', '5']:
-        print ('%s It didn\'t work' % bad)
-    else:
-        difference = abs(originalLength - len(response.text))
-        if difference <= tolerableDifference:
-            print ('%s It worked!' % good)
-else:
-    print ('%s It didn\'t work' % bad)
-
-print (' %s Phase: Analysing %s[%s6/6%s]%s' %
-       (lightning, green, end, green, end))
-
-binary = stringToBinary(''.join(allTokens))
-result = isRandom(binary)
-for name, result in result.items():
-    if not result:
-        print ('%s %s : %s%s%s' % (good, name, green, 'non-random', end))
+            print ('    %s A request %s didn\'t work' % (bad, messages[case]))
+
+
+def showAnalysis(result):
+    streaming = result.streaming
+    if streaming['test']:
+        print ('%s Running tests settled on %s after %i bits (%s, p=%.2g)' %
+               (info, streaming['verdict'], streaming['bits'],
+                streaming['test'], streaming['pvalue']))
+    for name, outcome in result.randomness.items():
+        state = outcome['state']
+        if state == 'failed':
+            print ('%s %s : %s%s%s (%.2fs)' %
+                   (good, name, green, 'non-random', end, outcome['time']))
+        elif state == 'passed':
+            print ('%s %s : %s%s%s (%.2fs)' %
+                   (bad, name, red, 'random', end, outcome['time']))
+        else:
+            print ('%s %s : %s %s' %
+                   (info, name, state, outcome['error'] or ''))
+
+
+def scan(target, headers, args):
+    """Runs a whole scan quietly and returns its findings as a record"""
+    started = time.time()
+    try:
+        # -t was applied to every host by configure()
+        record = Scanner(target, headers, args.level or 2, encoding=args.encoding,
+                         budget=args.budget).run().toDict()
+    except Exception as e:
+        record = {'target': target, 'error': repr(e)}
+    record['seconds'] = time.time() - started
+    return record
+
+
+def batch(args, headers):
+    """Scans many targets at once, a jsonl record is written as each one finishes"""
+    if args.targets == '-':
+        lines = sys.stdin.readlines()
     else:
-        print ('%s %s : %s%s%s' % (bad, name, red, 'random', end))
+        with open(args.targets) as targetFile:
+            lines = targetFile.readlines()
+    targets = [line.strip() for line in lines
+               if line.strip() and not line.startswith('#')]
+    core.config.quiet = True
+    output = open(args.output, 'a') if args.output else sys.stdout
+    # threads share the per host connection pools and concurrency controllers
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            futures = [executor.submit(scan, target, headers, args) for target in targets]
+            for future in concurrent.futures.as_completed(futures):
+                output.write(json.dumps(future.result(), default=str) + '\n')
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+def showStats(out):
+    summary = stats.summary()
+    print ('%s Requests: %i, bytes read: %i, responses: %s' %
+           (info, summary['requests'], summary['bytes'],
+            ', '.join('%s x%i' % (status, count) for status, count
+                      in sorted(summary['statuses'].items()))), file=out)
+    latency = summary['latency']
+    if latency['p50'] is not None:
+        print ('%s Latency p50 %.1fms, p90 %.1fms, p99 %.1fms, max %.1fms' %
+               (info, latency['p50'] * 1000, latency['p90'] * 1000,
+                latency['p99'] * 1000, latency['max'] * 1000), file=out)
+    for name, timing in summary['timings'].items():
+        print ('    %s>%s %-18s wall %8.2fs  cpu %8.2fs  requests %i' %
+               (yellow, end, name, timing['wall'], timing['cpu'],
+                summary['requestsByPhase'].get(name, 0)), file=out)
+
+
+def exportStats(args, out=sys.stdout):
+    if args.stats:
+        showStats(out)
+    if args.stats_json:
+        with open(args.stats_json, 'w') as statsFile:
+            json.dump(stats.summary(), statsFile, indent=4)
+    if args.prometheus:
+        stats.writeTextfile(args.prometheus)
+
+
+def main(argv=None):
+    parser = argumentParser()
+    args = parser.parse_args(argv)
+    if args.targets:
+        if args.output:
+            banner()
+        code = batch(args, configure(args))
+        exportStats(args, sys.stdout if args.output else sys.stderr)
+        return code
+    banner()
+    if not args.target:
+        print('\n' + parser.format_help().lower())
+        return 0
+    code = single(args, configure(args))
+    exportStats(args)
+    return code
+
+
+def single(args, headers):
+    scanner = Scanner(args.target, headers, args.level or 2, encoding=args.encoding,
+                      budget=args.budget)
+    result = scanner.result
+
+    phase('Crawling', 1)
+    scanner.crawl()
+    print ('\r%s Crawled %i URL(s) and found %i distinct form(s).%-10s' %
+           (info, result.urls, result.forms, ' '))
+    print ('%s Concurrency settled at %i request(s)' % (info, settled(args.target)))
+
+    phase('Evaluating', 2)
+    scanner.evaluate()
+    showEvaluation(result)
+
+    phase('Comparing', 3)
+    proceed = scanner.compare()
+    showComparison(result)
+    if not proceed:
+        print ('%s %s' % (bad, result.stopped))
+        return 0
+
+    phase('Observing', 4)
+    print ('%s Sampling fresh tokens in batches of up to %i simultaneous requests, please wait.' %
+           (info, core.config.sampleBatch))
+    scanner.observe()
+    showSample(result.sample)
+
+    phase('Testing', 5)
+    print ('%s Testing every protected form at once. It may take a while.' % run)
+    if not scanner.test():
+        print ('%s %s' % (bad, result.stopped))
+        return 0
+    for test in result.tests:
+        showTest(test)
+    print ('%s Concurrency settled at %i request(s)' % (info, settled(args.target)))
+
+    phase('Analysing', 6)
+    scanner.analyse()
+    showAnalysis(result)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import core.config
+from core.encoder import detectMode, decode, rankValue
+
+minBits = 1000  # bits needed before any p-value is reported
+
+
+def windows(bits, k):
+    '''Value of every k-bit window that fits in bits, without wrapping around'''
+    import numpy as np
+    count = len(bits) - k + 1
+    values = np.zeros(max(count, 0), dtype=np.int64)
+    for j in range(k if count > 0 else 0):
+        values = (values << 1) | bits[j:j + count]
+    return values
+
+
+class Accumulator:
+    """Keeps running counts for the randomness tests as tokens arrive"""
+
+    def __init__(self, mode='auto', nu=128, m=5, warmup=16):
+        self.mode = mode
+        self.ranks = None  # alphabet of the tokens when they are rank packed
+        self.pending = []  # tokens held back until the encoding is known
+        self.warmup = warmup
+        self.skipped = 0  # tokens that didn't fit the encoding
+        self.nu = nu  # bits in a block of the block frequency test
+        self.m = m  # pattern length of the serial test
+        self.n = 0
+        self.ones = 0
+        self.changes = 0  # neighbouring bits that differ, for the runs test
+        self.last = None
+        # numpy arrays, made when the first bits arrive so that numpy is only
+        # loaded by scans that find tokens
+        self.block = None  # bits of the unfinished block
+        self.blocks = 0
+        self.squares = 0.0  # sum of (proportion of ones - 1/2)^2 over blocks
+        self.head = None  # first bits, for the windows that wrap around
+        self.tail = None  # last bits, for windows across tokens
+        self.counts = None
+        self.walk = 0  # position of the random walk of the cumulative sums test
+        self.highest = 0
+        self.lowest = 0
+
+    def add(self, token):
+        if self.mode == 'auto' or (self.mode == 'rank' and self.ranks is None):
+            self.pending.append(token)
+            if len(self.pending) >= self.warmup:
+                self.flush()
+            return
+        self.update(self.encode(token))
+
+    def flush(self):
+        """Settles the encoding on the tokens seen so far and counts them"""
+        tokens, self.pending = self.pending, []
+        if not tokens:
+            return
+        if self.mode == 'auto':
+            self.mode = detectMode(tokens)
+        if self.mode == 'rank' and self.ranks is None:
+            alphabet = sorted(set(''.join(tokens)))
+            self.ranks = {char: rank for rank, char in enumerate(alphabet)}
+        for token in tokens:
+            self.update(self.encode(token))
+
+    def encode(self, token):
+        import numpy as np
+        if self.mode != 'rank':
+            data = decode(token, self.mode)
+            return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        try:
+            value, size = rankValue(token, self.ranks)
+        except KeyError:  # a character the alphabet didn't have
+            self.skipped += 1
+            return np.zeros(0, dtype=np.uint8)
+        if not size:
+            return np.zeros(0, dtype=np.uint8)
+        data = value.to_bytes((size + 7) // 8, 'big')
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8))[-size:]
+
+    def update(self, bits):
+        import numpy as np
+        if not len(bits):
+            return
+        if self.counts is None:
+            self.block = self.head = self.tail = np.zeros(0, dtype=np.int64)
+            self.counts = [np.zeros(2 ** (self.m - i), dtype=np.int64) for i in range(3)]
+        bits = bits.astype(np.int64)
+        self.n += len(bits)
+        self.ones += int(np.count_nonzero(bits))
+        self.changes += int(np.count_nonzero(bits[1:] != bits[:-1]))
+        if self.last is not None and self.last != bits[0]:
+            self.changes += 1
+        self.last = bits[-1]
+        # block frequency, only finished blocks are counted
+        joined = np.concatenate((self.block, bits))
+        full = len(joined) // self.nu
+        if full:
+            proportions = joined[:full * self.nu].reshape(full, self.nu).mean(axis=1)
+            self.squares += float(np.sum((proportions - 0.5) ** 2))
+            self.blocks += full
+        self.block = joined[full * self.nu:].copy()
+        # serial, every window that ends in the new bits is counted once
+        joined = np.concatenate((self.tail, bits))
+        for i, counts in enumerate(self.counts):
+            k = self.m - i
+            start = max(0, len(self.tail) - k + 1)
+            values = windows(joined[start:], k)
+            counts += np.bincount(values, minlength=len(counts))
+        keep = self.m - 1
+        if len(self.head) < keep:
+            self.head = joined[:keep].copy()
+        self.tail = joined[-keep:].copy()
+        # cumulative sums
+        walk = self.walk + np.cumsum(2 * bits - 1)
+        self.highest = max(self.highest, int(walk.max()))
+        self.lowest = min(self.lowest, int(walk.min()))
+        self.walk = int(walk[-1])
+
+    def pvalues(self):
+        """P-values of the tests on the bits counted so far"""
+        self.flush()
+        n = self.n
+        if n < minBits:
+            return {}
+        import numpy as np
+        import scipy.special as spc
+        from core.entropy import cumultativesumspvalue
+        result = {}
+        result['Monobit frequency test'] = spc.erfc(
+            abs(2 * self.ones - n) / np.sqrt(2.0 * n))
+        if self.blocks:
+            result['Block frequency test'] = spc.gammaincc(
+                self.blocks / 2.0, 2.0 * self.nu * self.squares)
+        pi = 1.0 * self.ones / n
+        if 0 < pi < 1:
+            result['Runs test'] = spc.erfc(
+                abs(self.changes + 1 - 2 * n * pi * (1 - pi)) /
+                (2 * pi * (1 - pi) * np.sqrt(2 * n)))
+        else:
+            result['Runs test'] = 0.0
+        psim = []
+        for i, counts in enumerate(self.counts):
+            k = self.m - i
+            # the windows that wrap around are only needed for the verdict
+            wrapped = np.concatenate((self.tail[len(self.tail) - k + 1:],
+                                      self.head[:k - 1]))
+            counts = counts + np.bincount(windows(wrapped, k), minlength=len(counts))
+            psim.append(2.0 ** k * np.sum(counts.astype(np.float64) ** 2) / n - n)
+        result['Serial test'] = [
+            spc.gammaincc(2 ** (self.m - 2), (psim[0] - psim[1]) / 2.0),
+            spc.gammaincc(2 ** (self.m - 3), (psim[0] - 2 * psim[1] + psim[2]) / 2.0)]
+        result['Cumultative sums test'] = cumultativesumspvalue(
+            n, max(self.highest, -self.lowest))
+        result['Cumultative sums test (reverse)'] = cumultativesumspvalue(
+            n, max(self.highest - self.walk, self.walk - self.lowest))
+        return result
+
+    def weakest(self):
+        """Test with the lowest p-value so far, as (name, p-value)"""
+        lowest = (None, 1.0)
+        for name, p in self.pvalues().items():
+            for value in (p if isinstance(p, list) else [p]):
+                if value < lowest[1]:
+                    lowest = (name, float(value))
+        return lowest
+
+    def verdict(self):
+        """non-random as soon as a test is decisive, random once enough bits
+        passed every test at the significance level"""
+        name, p = self.weakest()
+        if name and p < core.config.decisive:
+            return 'non-random'
+        if self.n >= core.config.onlineBits and p >= core.config.significance:
+            return 'random'
+        return 'undecided'
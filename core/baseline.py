@@ -0,0 +1,107 @@
+import re
+import codecs
+from hashlib import blake2b
+from collections import Counter
+
+import core.config
+from core import stats
+
+words = re.compile(r'\w+')
+
+
+def wordHash(word):
+    return int.from_bytes(blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def distance(a, b):
+    """Bits in which two fingerprints differ"""
+    return bin(a ^ b).count('1')
+
+
+class SimHash:
+    """64 bit SimHash of the words of a text that arrives in pieces"""
+
+    def __init__(self):
+        self.vector = [0] * 64
+        self.carry = ''  # a word cut by the end of the last piece
+
+    def update(self, text):
+        text = self.carry + text
+        match = re.search(r'\w+$', text)
+        cut = match.start() if match else len(text)
+        self.carry = text[cut:]
+        self.add(Counter(words.findall(text, 0, cut)))
+
+    def add(self, counts):
+        vector = self.vector
+        for word, weight in counts.items():
+            value = wordHash(word)
+            for bit in range(64):
+                if value >> bit & 1:
+                    vector[bit] += weight
+                else:
+                    vector[bit] -= weight
+
+    def digest(self):
+        if self.carry:
+            self.add({self.carry: 1})
+            self.carry = ''
+        return sum(1 << bit for bit in range(64) if self.vector[bit] > 0)
+
+
+def observe(response):
+    """(status code, length, fingerprint) of a streamed response, the body is never kept"""
+    simhash = SimHash()
+    length = 0
+    try:
+        try:
+            decoder = codecs.getincrementaldecoder(
+                response.encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        for chunk in response.iter_content(chunk_size=16384):
+            chunk = chunk[:core.config.maxSize - length]
+            length += len(chunk)
+            stats.count('bytes', len(chunk))
+            simhash.update(decoder.decode(chunk))
+            if length >= core.config.maxSize:
+                break
+        simhash.update(decoder.decode(b'', final=True))
+    finally:
+        response.close()
+    return response.status_code, length, simhash.digest()
+
+
+class Baseline:
+    """What untouched responses of a form look like, as a few fingerprints"""
+
+    def __init__(self):
+        self.codes = set()
+        self.lengths = []
+        self.hashes = []
+
+    def add(self, code, length, fingerprint):
+        self.codes.add(code)
+        self.lengths.append(length)
+        self.hashes.append(fingerprint)
+
+    def tolerance(self):
+        """Largest length difference between two untouched responses"""
+        return max(self.lengths) - min(self.lengths)
+
+    def spread(self):
+        """Largest fingerprint distance between two untouched responses"""
+        return max(distance(a, b) for a in self.hashes for b in self.hashes)
+
+    def dynamic(self):
+        return bool(self.tolerance() or self.spread())
+
+    def matches(self, code, length, fingerprint):
+        """True if a response can't be told apart from the untouched ones"""
+        if code not in self.codes or str(code)[0] in ['4', '5']:
+            return False
+        tolerance = self.tolerance()
+        if not min(self.lengths) - tolerance <= length <= max(self.lengths) + tolerance:
+            return False
+        nearest = min(distance(fingerprint, each) for each in self.hashes)
+        return nearest <= max(self.spread(), core.config.simhashDistance)
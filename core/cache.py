@@ -0,0 +1,32 @@
+import re
+import threading
+
+
+def fingerprint(form):
+    inputs = frozenset((inp['name'], inp['type'].lower())
+                       for inp in form['inputs'])
+    return (form['action'], form['method'].lower(), inputs)
+
+
+class FormCache:
+    """Stores each distinct form once along with the pages it was found on"""
+
+    def __init__(self):
+        self.forms = {}
+        self.lock = threading.Lock()
+
+    def add(self, url, form):
+        key = fingerprint(form)
+        # only values that can be tokens differ between pages worth keeping
+        values = {inp['name']: inp['value'] for inp in form['inputs']
+                  if inp['value'] and re.match(r'^[\w\-_]+$', inp['value'])}
+        with self.lock:
+            if key not in self.forms:
+                self.forms[key] = {'form': form, 'urls': {}}
+            self.forms[key]['urls'][url] = values
+
+    def __iter__(self):
+        return iter(list(self.forms.values()))
+
+    def __len__(self):
+        return len(self.forms)
@@ -9,7 +9,30 @@ headers = {  # default headers
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
     'Accept-Language': 'en-US,en;q=0.5',
     'Accept-Encoding': 'gzip,deflate',
-    'Connection': 'close',
+    'Connection': 'keep-alive',
     'DNT': '1',
     'Upgrade-Insecure-Requests': '1',
 }
+
+timeout = 20  # read timeout for http requests, in seconds
+connectTimeout = 10  # connect timeout for http requests, in seconds
+retries = 2  # times a failed request is retried
+backoff = 0.5  # base delay between retries, in seconds
+rate = 0  # requests per second per host, 0 means no limit
+burst = 1  # requests per host that can be made at once before the limit applies
+maxConcurrency = 64  # ceiling for in-flight requests per host
+maxSize = 2097152  # bytes of a response body that are parsed
+similarityLimit = 2000  # tokens above which similarity is estimated from a sample
+similaritySample = 300  # tokens sampled for the estimate
+testTimeout = 60  # seconds a randomness test can take
+decisive = 0.000001  # p-value at which token collection stops early
+onlineBits = 20000  # bits after which the running tests can call tokens random
+significance = 0.01  # p-value every running test has to reach for that
+sampleBudget = 100  # requests the observing phase can make
+sampleBatch = 10  # requests made at once while sampling
+collisionSpace = 64  # smallest token space whose repeats sampling should catch
+power = 0.9  # chance of catching a repeat in such a space before sampling stops
+sampleBits = 1024  # bits the running tests need before sampling can stop
+baselineSamples = 4  # untouched requests made for every form that is tested
+simhashDistance = 3  # bits in which responses with the same content may differ
+quiet = False  # no progress output while crawling, for batch mode
@@ -0,0 +1,36 @@
+class TokenDatabase:
+    """Indexes collected tokens by page and pages by token"""
+
+    def __init__(self, accumulator=None):
+        self.accumulator = accumulator  # running randomness tests, if any
+        self.tokens = []  # every token, in the order they were collected
+        self.urls = {}  # token -> urls it was found on
+        self.pages = {}  # url -> tokens found on it
+        self.weakTokens = []
+        self.insecureForms = []
+        self.insecureActions = set()
+
+    def addPage(self, url):
+        return self.pages.setdefault(url, set())
+
+    def add(self, url, token):
+        localTokens = self.addPage(url)
+        if token not in localTokens:
+            localTokens.add(token)
+            self.tokens.append(token)
+            self.urls.setdefault(token, set()).add(url)
+            if self.accumulator:
+                self.accumulator.add(token)
+
+    def addWeak(self, url, name, value):
+        self.weakTokens.append({url: {name: value}})
+
+    def addInsecure(self, url, form):
+        if form['action'] not in self.insecureActions:
+            self.insecureActions.add(form['action'])
+            self.insecureForms.append({url: form})
+
+    def replays(self):
+        """Tokens that were issued on more than one url"""
+        return {token: sorted(urls) for token, urls in self.urls.items()
+                if len(urls) > 1}
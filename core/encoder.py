@@ -0,0 +1,70 @@
+import re
+import base64
+import binascii
+from math import log
+
+modes = ['auto', 'raw', 'hex', 'base64', 'rank']
+
+
+def detectMode(tokens):
+    if all(re.match(r'^(?:[0-9a-fA-F]{2})+$', token) for token in tokens):
+        return 'hex'
+    alphabet = set(''.join(tokens))
+    if len(alphabet) > 36 and all(re.match(r'^[\w\-+/]+={0,2}$', token)
+                                  and len(token) % 4 != 1 for token in tokens):
+        return 'base64'
+    return 'rank'
+
+
+def decode(token, mode):
+    """Bytes behind a single token, raw bytes if it can't be decoded"""
+    try:
+        if mode == 'hex':
+            return bytes.fromhex(token)
+        if mode == 'base64':
+            token = token.rstrip('=').replace('+', '-').replace('/', '_')
+            return base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    except (ValueError, binascii.Error):
+        pass
+    return token.encode('utf-8')
+
+
+def rankValue(token, ranks):
+    """Token read as a number in the base of its alphabet and how many of its low bits are usable"""
+    base = len(ranks)
+    value = 0
+    for char in token:
+        value = value * base + ranks[char]
+    # a byte of headroom keeps the low bits of value close to uniform
+    size = max(0, int(len(token) * log(base, 2)) - 8) if base > 1 else 0
+    return value & ((1 << size) - 1), size
+
+
+def rankPack(tokens):
+    """Packs every token as a number written in the alphabet the tokens use"""
+    alphabet = sorted(set(''.join(tokens)))
+    ranks = {char: rank for rank, char in enumerate(alphabet)}
+    buffer = bytearray()
+    acc = width = 0  # bits that haven't filled a byte yet
+    for token in tokens:
+        value, size = rankValue(token, ranks)
+        acc = (acc << size) | value
+        width += size
+        whole = width // 8
+        if whole:
+            width -= whole * 8
+            buffer += (acc >> width).to_bytes(whole, 'big')
+            acc &= (1 << width) - 1
+    # trailing bits that don't fill a byte are dropped instead of padded
+    return bytes(buffer)
+
+
+def encodeTokens(tokens, mode='auto'):
+    """Encodes tokens into one contiguous buffer, 8 bits per byte"""
+    if not tokens:
+        return b''
+    if mode == 'auto':
+        mode = detectMode(tokens)
+    if mode == 'rank':
+        return rankPack(tokens)
+    return b''.join(decode(token, mode) for token in tokens)
@@ -6,6 +6,12 @@ import scipy.special as spc
 import scipy.fftpack as sff
 import scipy.stats as sst
 from functools import reduce
+import multiprocessing
+import time
+
+import core.config
+from core import gf2
+from core.utils import processContext
 
 
 def sumi(x): return 2 * x - 1
@@ -14,9 +20,6 @@ def sumi(x): return 2 * x - 1
 def su(x, y): return x + y
 
 
-def sus(x): return (x - 0.5) ** 2
-
-
 def sq(x): return int(x) ** 2
 
 
@@ -37,6 +40,41 @@ def stringpart(binin, num):
     return blocks
 
 
+def bitarray(binin):
+    '''Bits as a contiguous uint8 numpy array of zeroes and ones'''
+    if isinstance(binin, np.ndarray):
+        return binin.astype(np.uint8, copy=False)
+    if isinstance(binin, (bytes, bytearray, memoryview)):
+        return np.unpackbits(np.frombuffer(binin, dtype=np.uint8))
+    return np.frombuffer(binin.encode('ascii'), dtype=np.uint8) - ord('0')
+
+
+def bitstring(bits):
+    '''Bits as a string of '0' and '1' for the tests that still work on strings'''
+    return (bits + ord('0')).tobytes().decode('ascii')
+
+
+def patterns(bits, m):
+    '''Value of the m-bit pattern starting at every position, wrapping around at the end'''
+    n = len(bits)
+    values = np.zeros(n, dtype=np.int64)
+    if m > 0:
+        wrapped = np.concatenate((bits, bits[:m - 1])).astype(np.int64)
+        for j in range(m):
+            values = (values << 1) | wrapped[j:j + n]
+    return values
+
+
+def blockmatches(blocks, mat):
+    '''Marks every position in each row of blocks where the template starts'''
+    m = len(mat)
+    width = blocks.shape[1] - m + 1
+    hits = np.ones((blocks.shape[0], max(width, 0)), dtype=bool)
+    for j, bit in enumerate(mat):
+        hits &= blocks[:, j:j + width] == int(bit)
+    return hits
+
+
 def randgen(num):
     '''Spits out a stream of random numbers like '1001001' with the length num'''
 
@@ -52,33 +90,30 @@ def randgen(num):
 
 def monobitfrequencytest(binin):
     ''' The focus of the test is the proportion of zeroes and ones for the entire sequence. The purpose of this test is to determine whether that number of ones and zeros in a sequence are approximately the same as would be expected for a truly random sequence. The test assesses the closeness of the fraction of ones to 1/2, that is, the number of ones and zeroes in a sequence should be about the same.'''
-
-    ss = [int(el) for el in binin]
-    sc = list(map(sumi, ss))
-    sn = reduce(su, sc)
-    sobs = np.abs(sn) / np.sqrt(len(binin))
+    bits = bitarray(binin)
+    sn = 2 * int(np.count_nonzero(bits)) - len(bits)
+    sobs = np.abs(sn) / np.sqrt(len(bits))
     pval = spc.erfc(sobs / np.sqrt(2))
     return pval
 
 
 def blockfrequencytest(binin, nu=20):
     ''' The focus of the test is the proportion of zeroes and ones within M-bit blocks. The purpose of this test is to determine whether the frequency of ones is an M-bit block is approximately M/2.'''
-    ss = [int(el) for el in binin]
-    tt = [1.0 * sum(ss[xs * nu:nu + xs * nu:]) /
-          nu for xs in range(floor(len(ss) / nu))]
-    uu = list(map(sus, tt))
-    chisqr = 4 * nu * reduce(su, uu, 0)
-    pval = spc.gammaincc(len(tt) / 2.0, chisqr / 2.0)
+    bits = bitarray(binin)
+    blocks = floor(len(bits) / nu)
+    tt = bits[:blocks * nu].reshape(blocks, nu).mean(axis=1)
+    chisqr = 4 * nu * np.sum((tt - 0.5) ** 2)
+    pval = spc.gammaincc(blocks / 2.0, chisqr / 2.0)
     return pval
 
 
 def runstest(binin):
     ''' The focus of this test is the total number of zero and one runs in the entire sequence, where a run is an uninterrupted sequence of identical bits. A run of length k means that a run consists of exactly k identical bits and is bounded before and after with a bit of the opposite value. The purpose of the runs test is to determine whether the number of runs of ones and zeros of various lengths is as expected for a random sequence. In particular, this test determines whether the oscillation between such substrings is too fast or too slow.'''
-    ss = [int(el) for el in binin]
-    n = len(binin)
-    pi = 1.0 * reduce(su, ss) / n
-    vobs = len(binin.replace('0', ' ').split()) + \
-        len(binin.replace('1', ' ').split())
+    bits = bitarray(binin)
+    n = len(bits)
+    pi = 1.0 * np.count_nonzero(bits) / n
+    # every change of value between neighbouring bits starts a new run
+    vobs = 1 + int(np.count_nonzero(bits[1:] != bits[:-1]))
     pval = spc.erfc(abs(vobs-2*n*pi*(1-pi)) /
                     (2 * pi * (1 - pi) * np.sqrt(2*n)))
     return pval
@@ -170,46 +205,51 @@ def spectraltest(binin):
 
 def nonoverlappingtemplatematchingtest(binin, mat="000000001", num=9):
     ''' The focus of this test is the number of occurrences of pre-defined target substrings. The purpose of this test is to reject sequences that exhibit too many occurrences of a given non-periodic (aperiodic) pattern. For this test and for the Overlapping Template Matching test, an m-bit window is used to search for a specific m-bit pattern. If the pattern is not found, the window slides one bit position. For this test, when the pattern is found, the window is reset to the bit after the found pattern, and the search resumes.'''
-    n = len(binin)
+    bits = bitarray(binin)
+    n = len(bits)
     m = len(mat)
     M = floor(n/num)
-    blocks = [binin[xs*M:M+xs*M:] for xs in range(floor(n/M))]
-    counts = [xx.count(mat) for xx in blocks]
+    bign = floor(n/M)
+    blocks = bits[:bign * M].reshape(bign, M)
+    hits = blockmatches(blocks, mat)
+    if any(mat[i:] == mat[:m - i] for i in range(1, m)):
+        # the template overlaps itself, count matches left to right
+        counts = np.zeros(bign)
+        row = -1
+        free = 0
+        for xs, ys in zip(*(each.tolist() for each in np.nonzero(hits))):
+            if xs != row:
+                row = xs
+                free = 0
+            if ys >= free:
+                counts[xs] += 1
+                free = ys + m
+    else:
+        counts = hits.sum(axis=1)
     avg = 1.0 * (M-m+1)/2 ** m
     var = M*(2**-m - (2*m-1)*2**(-2*m))
-    chisqr = reduce(su, [(xs - avg) ** 2 for xs in counts]) / var
-    pval = spc.gammaincc(1.0 * len(blocks) / 2, chisqr / 2)
+    chisqr = np.sum((counts - avg) ** 2) / var
+    pval = spc.gammaincc(1.0 * bign / 2, chisqr / 2)
     return pval
 
 
-def occurances(string, sub):
-    count = start = 0
-    while True:
-        start = string.find(sub, start)+1
-        if start > 0:
-            count += 1
-        else:
-            return count
-
-
 def overlappingtemplatematchingtest(binin, mat="111111111", num=1032, numi=9):
     ''' The focus of this test is the number of pre-defined target substrings. The purpose of this test is to reject sequences that show deviations from the expected number of runs of ones of a given length. Note that when there is a deviation from the expected number of ones of a given length, there is also a deviation in the runs of zeroes. Runs of zeroes were not evaluated separately due to a concern about statistical independence among the tests. For this test and for the Non-overlapping Template Matching test, an m-bit window is used to search for a specific m-bit pattern. If the pattern is not found, the window slides one bit position. For this test, when the pattern is found, the window again slides one bit, and the search is resumed.'''
-    n = len(binin)
+    bits = bitarray(binin)
+    n = len(bits)
     bign = int(n / num)
+    if not bign:
+        raise ValueError('too few bits: %i' % n)
     m = len(mat)
     lamda = 1.0 * (num - m + 1) / 2 ** m
     eta = 0.5 * lamda
     pi = [pr(i, eta) for i in range(numi)]
     pi.append(1 - reduce(su, pi))
-    v = [0 for x in range(numi + 1)]
-    blocks = stringpart(binin, num)
-    blocklen = len(blocks[0])
-    counts = [occurances(i, mat) for i in blocks]
-    counts2 = [(numi if xx > numi else xx) for xx in counts]
-    for i in counts2:
-        v[i] = v[i] + 1
-    chisqr = reduce(su, [(v[i]-bign*pi[i]) ** 2 / (bign*pi[i])
-                         for i in range(numi + 1)])
+    pi = np.array(pi)
+    blocks = bits[:bign * num].reshape(bign, num)
+    counts = np.minimum(blockmatches(blocks, mat).sum(axis=1), numi)
+    v = np.bincount(counts, minlength=numi + 1)
+    chisqr = np.sum((v - bign * pi) ** 2 / (bign * pi))
     pval = spc.gammaincc(0.5*numi, 0.5*chisqr)
     return pval
 
@@ -276,31 +316,15 @@ def lempelzivcompressiontest1(binin):
 def serialtest(binin):
     m = int(log(len(binin), 2) - 3)
     ''' The focus of this test is the frequency of each and every overlapping m-bit pattern across the entire sequence. The purpose of this test is to determine whether the number of occurrences of the 2m m-bit overlapping patterns is approximately the same as would be expected for a random sequence. The pattern can overlap.'''
-    n = len(binin)
-    hbin = binin+binin[0:m-1:]
-    f1a = [hbin[xs:m+xs:] for xs in range(n)]
-    oo = set(f1a)
-    f1 = [f1a.count(xs)**2 for xs in oo]
-    f1 = list(map(f1a.count, oo))
-    cou = f1a.count
-    f2a = [hbin[xs:m-1+xs:] for xs in range(n)]
-    f2 = [f2a.count(xs)**2 for xs in set(f2a)]
-    f3a = [hbin[xs:m-2+xs:] for xs in range(n)]
-    f3 = [f3a.count(xs)**2 for xs in set(f3a)]
-    psim1 = 0
-    psim2 = 0
-    psim3 = 0
-    if m >= 0:
-        suss = reduce(su, f1)
-        psim1 = 1.0 * 2 ** m * suss / n - n
-    if m >= 1:
-        suss = reduce(su, f2)
-        psim2 = 1.0 * 2 ** (m - 1) * suss / n - n
-    if m >= 2:
-        suss = reduce(su, f3)
-        psim3 = 1.0 * 2 ** (m - 2) * suss / n - n
-    d1 = psim1-psim2
-    d2 = psim1-2 * psim2 + psim3
+    bits = bitarray(binin)
+    n = len(bits)
+    psim = [0, 0, 0]
+    for i in range(3):
+        if m - i >= 0:
+            counts = np.bincount(patterns(bits, m - i)).astype(np.float64)
+            psim[i] = 1.0 * 2 ** (m - i) * np.sum(counts ** 2) / n - n
+    d1 = psim[0]-psim[1]
+    d2 = psim[0]-2 * psim[1] + psim[2]
     pval1 = spc.gammaincc(2 ** (m - 2), d1 / 2.0)
     pval2 = spc.gammaincc(2 ** (m - 3), d2 / 2.0)
     return [pval1, pval2]
@@ -308,29 +332,26 @@ def serialtest(binin):
 
 def cumultativesumstest(binin):
     ''' The focus of this test is the maximal excursion (from zero) of the random walk defined by the cumulative sum of adjusted (-1, +1) digits in the sequence. The purpose of the test is to determine whether the cumulative sum of the partial sequences occurring in the tested sequence is too large or too small relative to the expected behavior of that cumulative sum for random sequences.  This cumulative sum may be considered as a random walk. For a random sequence, the random walk should be near zero. For non-random sequences, the excursions of this random walk away from zero will be too large.'''
-    n = len(binin)
-    ss = [int(el) for el in binin]
-    sc = list(map(sumi, ss))
-    cs = np.cumsum(sc)
-    z = max(abs(cs))
-    ra = 0
-    start = int(np.floor(0.25 * np.floor(-n / z) + 1))
-    stop = int(np.floor(0.25 * np.floor(n / z) - 1))
-    pv1 = []
-    for k in range(start, stop + 1):
-        pv1.append(sst.norm.cdf((4 * k + 1) * z / np.sqrt(n)) -
-                   sst.norm.cdf((4 * k - 1) * z / np.sqrt(n)))
-    start = int(np.floor(0.25 * np.floor(-n / z - 3)))
-    stop = int(np.floor(0.25 * np.floor(n / z) - 1))
-    pv2 = []
-    for k in range(start, stop + 1):
-        pv2.append(sst.norm.cdf((4 * k + 3) * z / np.sqrt(n)) -
-                   sst.norm.cdf((4 * k + 1) * z / np.sqrt(n)))
-    pval = 1
-    pval -= reduce(su, pv1)
-    pval += reduce(su, pv2)
-
-    return pval
+    bits = bitarray(binin)
+    n = len(bits)
+    cs = np.cumsum(2 * bits.astype(np.int64) - 1)
+    z = np.max(np.abs(cs))
+    return cumultativesumspvalue(n, z)
+
+
+def cumultativesumspvalue(n, z):
+    '''P-value of a random walk of n steps whose largest excursion is z'''
+    # summation bounds of section 2.13.4 of NIST SP 800-22
+    ks = np.arange(int(np.floor((-n / z + 1) / 4)),
+                   int(np.floor((n / z - 1) / 4)) + 1)
+    pv1 = sst.norm.cdf((4 * ks + 1) * z / np.sqrt(n)) - \
+        sst.norm.cdf((4 * ks - 1) * z / np.sqrt(n))
+    ks = np.arange(int(np.floor((-n / z - 3) / 4)),
+                   int(np.floor((n / z - 1) / 4)) + 1)
+    pv2 = sst.norm.cdf((4 * ks + 3) * z / np.sqrt(n)) - \
+        sst.norm.cdf((4 * ks + 1) * z / np.sqrt(n))
+    pval = 1 - np.sum(pv1) + np.sum(pv2)
+    return float(min(1.0, max(0.0, pval)))
 
 
 def cumultativesumstestreverse(binin):
@@ -352,104 +373,52 @@ def pik(k, x):
 def randomexcursionstest(binin):
     ''' The focus of this test is the number of cycles having exactly K visits in a cumulative sum random walk. The cumulative sum random walk is found if partial sums of the (0,1) sequence are adjusted to (-1, +1). A random excursion of a random walk consists of a sequence of n steps of unit length taken at random that begin at and return to the origin. The purpose of this test is to determine if the number of visits to a state within a random walk exceeds what one would expect for a random sequence.'''
     xvals = [-4, -3, -2, -1, 1, 2, 3, 4]
-    ss = [int(el) for el in binin]
-    sc = list(map(sumi, ss))
-    cumsum = np.cumsum(sc)
-    cumsum = np.append(cumsum, 0)
-    cumsum = np.append(0, cumsum)
-    posi = np.where(cumsum == 0)[0]
-    cycles = ([cumsum[posi[x]:posi[x+1]+1] for x in range(len(posi)-1)])
-    j = len(cycles)
-    sct = []
-    for ii in cycles:
-        sct.append(([len(np.where(ii == xx)[0]) for xx in xvals]))
-    sct = np.transpose(np.clip(sct, 0, 5))
+    bits = bitarray(binin)
+    cumsum = np.concatenate(
+        ([0], np.cumsum(2 * bits.astype(np.int64) - 1), [0]))
+    zeros = cumsum == 0
+    j = int(np.count_nonzero(zeros)) - 1  # cycles between returns to zero
+    cycle = np.cumsum(zeros) - 1
     su = []
-    for ii in range(6):
-        su.append([(xx == ii).sum() for xx in sct])
-    su = np.transpose(su)
-    pikt = ([([pik(uu, xx) for uu in range(6)]) for xx in xvals])
-    # chitab=1.0*((su-j*pikt)**2)/(j*pikt)
-    chitab = np.sum(1.0*(np.array(su)-j*np.array(pikt))
-                    ** 2/(j*np.array(pikt)), axis=1)
+    for xx in xvals:
+        visits = np.bincount(cycle[cumsum == xx], minlength=j)[:j]
+        su.append(np.bincount(np.minimum(visits, 5), minlength=6))
+    pikt = np.array([[pik(uu, xx) for uu in range(6)] for xx in xvals])
+    chitab = np.sum(1.0*(np.array(su)-j*pikt) ** 2/(j*pikt), axis=1)
     pval = ([spc.gammaincc(2.5, cs/2.0) for cs in chitab])
     return pval
 
 
-def getfreq(linn, nu):
-    val = 0
-    for (x, y) in linn:
-        if x == nu:
-            val = y
-    return val
-
-
 def randomexcursionsvarianttest(binin):
     ''' The focus of this test is the number of times that a particular state occurs in a cumulative sum random walk. The purpose of this test is to detect deviations from the expected number of occurrences of various states in the random walk.'''
-    ss = [int(el) for el in binin]
-    sc = list(map(sumi, ss))
-    cs = np.cumsum(sc)
-    li = []
-    for xs in sorted(set(cs)):
-        if np.abs(xs) <= 9:
-            li.append([xs, len(np.where(cs == xs)[0])])
-    j = getfreq(li, 0) + 1
+    bits = bitarray(binin)
+    cs = np.cumsum(2 * bits.astype(np.int64) - 1)
+    inrange = cs[np.abs(cs) <= 9]
+    freqs = np.bincount(inrange + 9, minlength=19)
+    j = freqs[9] + 1
     pval = []
     for xs in range(-9, 9 + 1):
         if not xs == 0:
-            # pval.append([xs, spc.erfc(np.abs(getfreq(li, xs) - j) / np.sqrt(2 * j * (4 * np.abs(xs) - 2)))])
-            pval.append(spc.erfc(np.abs(getfreq(li, xs) - j) /
+            pval.append(spc.erfc(np.abs(freqs[xs + 9] - j) /
                                  np.sqrt(2 * j * (4 * np.abs(xs) - 2))))
     return pval
 
 
 def aproximateentropytest(binin, m=5):
     ''' The focus of this test is the frequency of each and every overlapping m-bit pattern. The purpose of the test is to compare the frequency of overlapping blocks of two consecutive/adjacent lengths (m and m+1) against the expected result for a random sequence.'''
-    n = len(binin)
-    f1a = [(binin + binin[0:m - 1:])[xs:m + xs:] for xs in range(n)]
-    f1 = [[xs, f1a.count(xs)] for xs in sorted(set(f1a))]
-    f2a = [(binin + binin[0:m:])[xs:m + 1 + xs:] for xs in range(n)]
-    f2 = [[xs, f2a.count(xs)] for xs in sorted(set(f2a))]
-    c1 = [1.0 * f1[xs][1] / n for xs in range(len(f1))]
-    c2 = [1.0 * f2[xs][1] / n for xs in range(len(f2))]
-    phi1 = reduce(su, list(map(logo, c1)))
-    phi2 = reduce(su, list(map(logo, c2)))
-    apen = phi1 - phi2
+    bits = bitarray(binin)
+    n = len(bits)
+    phi = []
+    for size in (m, m + 1):
+        counts = np.bincount(patterns(bits, size))
+        c = 1.0 * counts[counts > 0] / n
+        phi.append(np.sum(c * np.log(c)))
+    apen = phi[0] - phi[1]
     chisqr = 2.0 * n * (np.log(2) - apen)
     pval = spc.gammaincc(2 ** (m - 1), chisqr / 2.0)
     return pval
 
 
-def matrank(mat):  # old function, does not work as advertized - gives the matrix rank, but not binary
-    u, s, v = np.linalg.svd(mat)
-    rank = np.sum(s > 1e-10)
-    return rank
-
-
-def mrank(matrix):  # matrix rank as defined in the NIST specification
-    m = len(matrix)
-    leni = len(matrix[0])
-
-    def proc(mat):
-        for i in range(m):
-            if mat[i][i] == 0:
-                for j in range(i+1, m):
-                    if mat[j][i] == 1:
-                        mat[j], mat[i] = mat[i], mat[j]
-                        break
-            if mat[i][i] == 1:
-                for j in range(i+1, m):
-                    if mat[j][i] == 1:
-                        mat[j] = [mat[i][x] ^ mat[j][x] for x in range(leni)]
-        return mat
-    maa = proc(matrix)
-    maa.reverse()
-    mu = [i[::-1] for i in maa]
-    muu = proc(mu)
-    ra = np.sum(np.sign([xx.sum() for xx in np.array(mu)]))
-    return ra
-
-
 def binarymatrixranktest(binin, m=32, q=32):
     ''' The focus of the test is the rank of disjoint sub-matrices of the entire sequence. The purpose of this test is to check for linear dependence among fixed length substrings of the original sequence.'''
     p1 = 1.0
@@ -457,15 +426,12 @@ def binarymatrixranktest(binin, m=32, q=32):
         p1 *= 1-(1.0/(2**x))
     p2 = 2*p1
     p3 = 1-p1-p2
-    n = len(binin)
-    # the input string as numbers, to generate the dot product
-    u = [int(el) for el in binin]
-    f1a = [u[xs*m:xs*m+m:] for xs in range(floor(n/m))]
-    n = len(f1a)
-    f2a = [f1a[xs*q:xs*q+q:] for xs in range(floor(n/q))]
-    # r=map(matrank,f2a)
-    r = list(map(mrank, f2a))
-    n = len(r)
+    bits = bitarray(binin)
+    n = floor(len(bits) / (m * q))
+    # every row of m bits becomes an integer, matrices are q rows each
+    packed = np.packbits(bits[:n * m * q].reshape(n * q, m), axis=1)
+    rows = [int.from_bytes(row.tobytes(), 'big') for row in packed]
+    r = [gf2.rank(rows[xs*q:xs*q+q:]) for xs in range(n)]
     fm = r.count(m)
     fm1 = r.count(m-1)
     chisqr = ((fm-p1*n)**2)/(p1*n)+((fm1-p2*n)**2) / \
@@ -473,36 +439,6 @@ def binarymatrixranktest(binin, m=32, q=32):
     pval = np.exp(-0.5*chisqr)
     return pval
 
-
-def lincomplex(binin):
-    lenn = len(binin)
-    c = b = np.zeros(lenn)
-    c[0] = b[0] = 1
-    l = 0
-    m = -1
-    n = 0
-    # the input string as numbers, to generate the dot product
-    u = [int(el) for el in binin]
-    p = 99
-    while n < lenn:
-        v = u[(n-l):n]  # was n-l..n-1
-        v.reverse()
-        cc = c[1:l+1]  # was 2..l+1
-        d = (u[n]+np.dot(v, cc)) % 2
-        if d == 1:
-            tmp = c
-            p = np.zeros(lenn)
-            for i in range(0, l):  # was 1..l+1
-                if b[i] == 1:
-                    p[i+n-m] = 1
-            c = (c+p) % 2
-            if l <= 0.5*n:  # was if 2l <= n
-                l = n+1-l
-                m = n
-                b = tmp
-        n += 1
-    return l
-
 # test 2.10
 
 
@@ -511,9 +447,10 @@ def linearcomplexitytest(binin, m=500):
     k = 6
     pi = [0.01047, 0.03125, 0.125, 0.5, 0.25, 0.0625, 0.020833]
     avg = 0.5*m + (1.0/36)*(9 + (-1)**(m + 1)) - (m/3.0 + 2.0/9)/2**m
-    blocks = stringpart(binin, m)
-    bign = len(blocks)
-    lc = ([lincomplex(chunk) for chunk in blocks])
+    bits = bitarray(binin)
+    bign = floor(len(bits) / m)
+    blocks = bits[:bign * m].reshape(bign, m)
+    lc = ([gf2.berlekampmassey(chunk) for chunk in blocks.tolist()])
     t = ([-1.0*(((-1)**m)*(chunk-avg)+2.0/9) for chunk in lc])
     vg = np.histogram(t, bins=[-9999999999, -2.5, -
                                1.5, -0.5, 0.5, 1.5, 2.5, 9999999999])[0][::-1]
@@ -523,90 +460,73 @@ def linearcomplexitytest(binin, m=500):
     return pval
 
 
-def isRandom(bits):
-    result = {}
-
-    def adder(name, p):
-        if 'list' in str(type(p)):
-            count = 0
-            for i in p:
-                if 'nan' in str(i):
-                    pass
-                elif 'e' in str(i):
-                    pass
-                elif i > 0.01:
-                    pass
-                else:
-                    count += 1
-            if count >= (len(p)/2):
-                result[name] = False
-            else:
-                result[name] = True
-        elif 'e' in str(p):
-            pass
-        elif p > 0.01:
-            result[name] = True
-        else:
-            result[name] = False
-    try:
-        adder('Monobit frequency test', monobitfrequencytest(bits[:100]))
-    except:
-        pass
-    try:
-        adder('Block frequency test', blockfrequencytest(bits[:2000]))
-    except:
-        pass
-    try:
-        adder('Runs test', runstest(bits))
-    except:
-        pass
-    try:
-        adder('Spectral test', spectraltest(bits[:1024]))
-    except:
-        pass
-    try:
-        adder('Non-overlapping template matching test',
-              nonoverlappingtemplatematchingtest(bits[:1048576], '11111', 8))
-    except:
-        pass
-    try:
-        adder('Overlapping template matching test',
-              overlappingtemplatematchingtest(bits[:998976], '0000001', 12, 5))
-    except:
-        pass
+battery = [  # name, test, bits it looks at, extra arguments, needs a string
+    ('Monobit frequency test', monobitfrequencytest, 100, (), False),
+    ('Block frequency test', blockfrequencytest, 2000, (), False),
+    ('Runs test', runstest, None, (), False),
+    ('Spectral test', spectraltest, 1024, (), False),
+    ('Non-overlapping template matching test',
+     nonoverlappingtemplatematchingtest, 1048576, ('11111', 8), False),
+    ('Overlapping template matching test',
+     overlappingtemplatematchingtest, 998976, ('0000001', 12, 5), False),
+    ('Serial test', serialtest, 500, (), False),
+    ('Cumultative sums test', cumultativesumstest, 100, (), False),
+    ('Aproximate entropy test', aproximateentropytest, 500, (5,), False),
+    ('Random excursions variant test',
+     randomexcursionsvarianttest, 1000000, (), False),
+    ('Linear complexity test', linearcomplexitytest, 1000000, (10,), False),
+    ('Binary matrix rank test', binarymatrixranktest, 1000000, (), False),
+    ('Longest runs test', longestrunones10000, None, (), True),
+    ('Maurers universal statistic test',
+     maurersuniversalstatistictest, 387840, (6, 640), True),
+    ('Random excursions test', randomexcursionstest, 1000000, (), False),
+]
+
+
+def verdict(p):
+    '''passed if the bits look random, failed if most p-values say they don't'''
+    values = [float(i) for i in np.ravel(p) if not np.isnan(i)]
+    if not values:
+        return 'skipped'
+    failed = len([i for i in values if i <= 0.01])
+    return 'failed' if failed >= len(values) / 2 else 'passed'
+
+
+def runTest(index, packed, length):
+    name, test, limit, args, legacy = battery[index]
+    bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8))[:length]
+    bits = bits[:limit]
+    started, cpu = time.time(), time.process_time()
     try:
-        adder('Serial test', serialtest(bits[:500]))
-    except:
-        pass
-    try:
-        adder('Cumultative sums test', cumultativesumstest(bits[:100]))
-    except:
-        pass
-    try:
-        adder('Aproximate entropy test', aproximateentropytest(bits[:500], 5))
-    except:
-        pass
-    try:
-        adder('Random excursions variant test',
-              randomexcursionsvarianttest(bits[:1000000]))
-    except:
-        pass
-    try:
-        adder('Linear complexity test',
-              linearcomplexitytest(bits[:1000000], 10))
-    except:
-        pass
-    try:
-        adder('Longest runs test', longestrunones10000(bits))
-    except:
-        pass
-    try:
-        adder('Maurers universal statistic test',
-              maurersuniversalstatistictest(bits[:387840], 6, 640))
-    except:
-        pass
+        p = test(bitstring(bits) if legacy else bits, *args)
+        pvalue = [float(i) for i in p] if np.ndim(p) else float(p)
+        return {'state': verdict(p), 'pvalue': pvalue, 'time': time.time() - started,
+                'cpu': time.process_time() - cpu, 'error': None}
+    except Exception as e:
+        return {'state': 'error', 'pvalue': None, 'time': time.time() - started,
+                'cpu': time.process_time() - cpu, 'error': repr(e)}
+
+
+def isRandom(bits, timeout=None):
+    '''Runs every test of the battery in its own process'''
+    timeout = timeout or core.config.testTimeout
+    array = bitarray(bits)
+    packed = np.packbits(array).tobytes()
+    result = {}
+    # one process per test so that every test starts right away and
+    # a test that hangs can be killed when its time is up
+    pool = processContext().Pool(len(battery))
     try:
-        adder('Random excursions test', randomexcursionstest(bits[:1000000]))
-    except:
-        pass
+        jobs = [pool.apply_async(runTest, (index, packed, len(array)))
+                for index in range(len(battery))]
+        deadline = time.time() + timeout
+        for (name, test, limit, args, legacy), job in zip(battery, jobs):
+            try:
+                result[name] = job.get(max(0, deadline - time.time()))
+            except multiprocessing.TimeoutError:
+                result[name] = {'state': 'timed out', 'pvalue': None,
+                                'time': timeout, 'cpu': None, 'error': None}
+    finally:
+        pool.terminate()
+        pool.join()
     return result
@@ -1,31 +1,30 @@
 from re import match
 from core.utils import strength
 from core.config import commonNames
+from core import stats
 
 
-def evaluate(dataset, weakTokens, tokenDatabase, allTokens, insecureForms):
-    done = []
-    for i in dataset:
-        for url, page in i.items():
-            localTokens = set()
-            for each in page.values():
-                protected = False
-                action = each['action']
-                method = each['method']
-                inputs = each['inputs']
-                for inp in inputs:
-                    name = inp['name']
-                    value = inp['value']
-                    if value and match(r'^[\w\-_]+$', value):
-                        if strength(value) > 10:
-                            localTokens.add(value)
-                            protected = True
-                            break
-                        elif name.lower() in commonNames:
-                            weakTokens.append({url: {name: value}})
-                if not protected and action not in done:
-                    done.append(done)
-                    insecureForms.append({url: each})
-            for token in localTokens:
-                allTokens.append(token)
-            tokenDatabase.append({url: localTokens})
+def evaluate(dataset, database):
+    for entry in dataset:  # every distinct form is evaluated only once
+        form = entry['form']
+        stats.count('forms evaluated')
+        urls = entry['urls']
+        firstUrl = next(iter(urls))
+        tokenName = None
+        for inp in form['inputs']:
+            name = inp['name']
+            value = inp['value']
+            if value and match(r'^[\w\-_]+$', value):
+                if strength(value) > 10:
+                    tokenName = name
+                    break
+                elif name.lower() in commonNames:
+                    database.addWeak(firstUrl, name, value)
+        if not tokenName:
+            database.addInsecure(firstUrl, form)
+        for url, values in urls.items():
+            database.addPage(url)
+            token = values.get(tokenName)
+            if token and strength(token) > 10:
+                stats.count('tokens found')
+                database.add(url, token)
@@ -0,0 +1,36 @@
+'''Linear algebra over GF(2) with python integers used as bitsets'''
+
+
+def parity(x):
+    return bin(x).count('1') & 1
+
+
+def berlekampmassey(bits):
+    '''Length of the shortest linear feedback shift register that generates bits'''
+    c = b = 1  # connection polynomials, bit i is the coefficient of x^i
+    l = 0
+    m = -1
+    window = 0  # bit i is the input bit at n - i
+    for n, bit in enumerate(bits):
+        window = (window << 1) | int(bit)
+        if parity(c & window):  # discrepancy
+            tmp = c
+            c ^= b << (n - m)
+            if 2 * l <= n:
+                l = n + 1 - l
+                m = n
+                b = tmp
+    return l
+
+
+def rank(rows):
+    '''Rank of a binary matrix given as one integer per row'''
+    pivots = {}  # highest set bit -> reduced row
+    for row in rows:
+        while row:
+            top = row.bit_length() - 1
+            if top not in pivots:
+                pivots[top] = row
+                break
+            row ^= pivots[top]
+    return len(pivots)
@@ -0,0 +1,143 @@
+import json
+import hashlib
+import string
+from collections import Counter
+from pathlib import Path
+import re
+
+try:
+    import re._parser as sre_parse
+    from re._constants import MAXREPEAT
+except ImportError:  # python < 3.11
+    import sre_parse
+    from sre_constants import MAXREPEAT
+
+database = Path(__file__).parent.parent.joinpath('db/hashes.json')
+cache = Path(__file__).parent.parent.joinpath('db/hashes.cache.json')
+
+categories = {
+    sre_parse.CATEGORY_DIGIT: string.digits,
+    sre_parse.CATEGORY_SPACE: string.whitespace,
+}
+
+
+def alphabet(parsed):
+    """Characters a parsed pattern can match, None if it can match anything"""
+    chars = set()
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            chars.add(chr(av))
+        elif op == sre_parse.IN:
+            for kind, value in av:
+                if kind == sre_parse.LITERAL:
+                    chars.add(chr(value))
+                elif kind == sre_parse.RANGE:
+                    chars.update(map(chr, range(value[0], value[1] + 1)))
+                elif kind == sre_parse.CATEGORY and value in categories:
+                    chars.update(categories[value])
+                else:
+                    return None
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            sub = alphabet(av[2])
+            if sub is None:
+                return None
+            chars.update(sub)
+        elif op == sre_parse.SUBPATTERN:
+            sub = alphabet(av[-1])
+            if sub is None:
+                return None
+            chars.update(sub)
+        elif op == sre_parse.BRANCH:
+            for branch in av[1]:
+                sub = alphabet(branch)
+                if sub is None:
+                    return None
+                chars.update(sub)
+        elif op != sre_parse.AT:
+            return None
+    return chars
+
+
+def analyse(patterns):
+    signatures = []
+    for element in patterns:
+        parsed = sre_parse.parse(element['regex'])
+        low, high = parsed.getwidth()
+        chars = alphabet(parsed)
+        signatures.append({
+            'regex': element['regex'],
+            'matches': element['matches'],
+            'min': low,
+            'max': None if high >= MAXREPEAT else high,
+            'alphabet': ''.join(sorted(chars)) if chars is not None else None
+        })
+    return signatures
+
+
+def loadSignatures():
+    """Analysed signature database, cached on disk next to db/hashes.json"""
+    raw = database.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+    try:
+        with cache.open('r') as f:
+            cached = json.load(f)
+        if cached['digest'] == digest:
+            return cached['signatures']
+    except (OSError, ValueError, KeyError):
+        pass
+    signatures = analyse(json.loads(raw.decode('utf-8')))
+    try:
+        with cache.open('w') as f:
+            json.dump({'digest': digest, 'signatures': signatures}, f)
+    except OSError:
+        pass
+    return signatures
+
+
+class Classifier:
+    """Matches tokens against the hash signatures a length and alphabet allow"""
+
+    def __init__(self, signatures):
+        self.fixed = {}  # length -> signatures of exactly that length
+        self.variable = []  # signatures whose length can vary
+        for signature in signatures:
+            allowed = signature['alphabet']
+            compiled = (re.compile(signature['regex']),
+                        None if allowed is None else frozenset(allowed),
+                        signature['min'], signature['max'],
+                        signature['matches'])
+            if signature['min'] == signature['max']:
+                self.fixed.setdefault(signature['min'], []).append(compiled)
+            else:
+                self.variable.append(compiled)
+
+    def classify(self, token):
+        length = len(token)
+        chars = frozenset(token)
+        names = []
+        candidates = self.fixed.get(length, []) + [
+            each for each in self.variable
+            if each[2] <= length and (each[3] is None or length <= each[3])]
+        for pattern, allowed, low, high, matches in candidates:
+            if allowed is not None and not chars <= allowed:
+                continue
+            if pattern.match(token):
+                names.extend(matches)
+        return names
+
+    def histogram(self, tokens):
+        """Number of tokens matching each hash type"""
+        counts = Counter()
+        for token in set(tokens):
+            counts.update(set(self.classify(token)))
+        return counts
+
+
+classifier = None
+
+
+def hashTypes(tokens):
+    global classifier
+    if not classifier:
+        classifier = Classifier(loadSignatures())
+    return classifier.histogram(tokens)
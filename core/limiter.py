@@ -0,0 +1,144 @@
+import time
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+import core.config
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = self.burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens +
+                                  (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Controller:
+    """Additive-increase/multiplicative-decrease limit on in-flight requests"""
+
+    def __init__(self, limit, ceiling, window=20, drift=0.05):
+        self.limit = float(max(1, limit))
+        self.ceiling = max(ceiling, self.limit)
+        self.inflight = 0
+        self.successes = 0
+        self.latencies = deque(maxlen=window)
+        self.baseline = None  # p95 latency of the host when it's not overloaded
+        self.drift = drift  # share of the gap to the last p95 the baseline closes
+        self.lastDecrease = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.inflight >= int(self.limit):
+                self.condition.wait()
+            self.inflight += 1
+        return time.monotonic()
+
+    def acquireMany(self, count):
+        """Takes up to count slots at once, as many as the limit allows"""
+        with self.condition:
+            while self.inflight + min(count, int(self.limit)) > int(self.limit):
+                self.condition.wait()
+            count = min(count, int(self.limit))
+            self.inflight += count
+        return count
+
+    def release(self, started, healthy, latency=None):
+        """latency is the time until the response headers arrived,
+        the time since started if it isn't known"""
+        with self.condition:
+            self.inflight -= 1
+            # requests sent before the last cut can't tell us anything new
+            if started >= self.lastDecrease:
+                if not healthy:
+                    self.decrease()
+                else:
+                    if latency is None:
+                        latency = time.monotonic() - started
+                    self.latencies.append(latency)
+                    if self.latencies.maxlen == len(self.latencies):
+                        ordered = sorted(self.latencies)
+                        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+                        if self.baseline is None or p95 < self.baseline:
+                            self.baseline = p95
+                        elif p95 > self.baseline * 2:
+                            self.decrease()
+                        else:
+                            # one fast window doesn't hold the host to it forever
+                            self.baseline += (p95 - self.baseline) * self.drift
+                    self.successes += 1
+                    if self.successes >= self.limit:
+                        self.limit = min(self.ceiling, self.limit + 1)
+                        self.successes = 0
+            self.condition.notify_all()
+
+    def setLimit(self, limit):
+        with self.condition:
+            self.limit = float(max(1, limit))
+            self.ceiling = max(self.ceiling, self.limit)
+            self.successes = 0
+            self.condition.notify_all()
+
+    def decrease(self):
+        self.limit = max(1.0, self.limit / 2)
+        self.successes = 0
+        self.latencies.clear()
+        self.baseline = None  # learnt again at the new limit
+        self.lastDecrease = time.monotonic()
+
+
+buckets = {}  # one bucket per host
+bucketsLock = threading.Lock()
+controllers = {}  # one concurrency controller per host
+concurrency = 10  # in-flight requests a new host starts with
+
+
+def throttle(url):
+    if core.config.rate <= 0:
+        return
+    host = urlparse(url).netloc
+    with bucketsLock:
+        if host not in buckets:
+            buckets[host] = TokenBucket(core.config.rate, core.config.burst)
+        bucket = buckets[host]
+    bucket.acquire()
+
+
+def setConcurrency(threadCount, url=None):
+    """In-flight requests every new host starts with, or only the host of url"""
+    global concurrency
+    if url:
+        # requests in flight keep counting against the controller they came from
+        getController(url).setLimit(threadCount)
+        return
+    with bucketsLock:
+        concurrency = threadCount
+        controllers.clear()
+
+
+def getController(url):
+    host = urlparse(url).netloc
+    with bucketsLock:
+        if host not in controllers:
+            controllers[host] = Controller(
+                concurrency, core.config.maxConcurrency)
+        return controllers[host]
+
+
+def settled(url):
+    return int(getController(url).limit)
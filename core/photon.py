@@ -1,16 +1,34 @@
 # Let's import what we need
-from re import findall
+import asyncio
 import concurrent.futures
 from urllib.parse import urlparse  # for python3
 
+import core.config
+from core import stats
+from core.cache import FormCache
 from core.colors import run
-from core.zetanize import zetanize
-from core.requester import requester
+from core.zetanize import FormParser
+from core.requester import streamer
 from core.utils import getUrl, getParams, remove_file
 
 
+class PageParser(FormParser):
+    """Collects the links of a page along with its forms"""
+
+    def __init__(self, url):
+        super().__init__(url)
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value:
+                    self.links.append(value)
+        super().handle_starttag(tag, attrs)
+
+
 def photon(seedUrl, headers, depth, threadCount):
-    forms = []  # web forms
+    forms = FormCache()  # distinct web forms
     processed = set()  # urls that have been crawled
     storage = set()  # urls that belong to the target i.e. in-scope
     scheme = urlparse(seedUrl).scheme
@@ -19,44 +37,84 @@ def photon(seedUrl, headers, depth, threadCount):
     storage.add(seedUrl)
 
     def rec(url):
+        found = set()  # in-scope links found on this page
         processed.add(url)
-        urlPrint = (url + (' ' * 60))[:60]
-        print ('%s Parsing %-40s' % (run, urlPrint), end='\r')
+        stats.count('pages')
+        if not core.config.quiet:
+            urlPrint = (url + (' ' * 60))[:60]
+            print ('%s Parsing %-40s' % (run, urlPrint), end='\r')
         url = getUrl(url, '', True)
         params = getParams(url, '', True)
         if '=' in url:
             inps = []
             for name, value in params.items():
-                inps.append({'name': name, 'value': value})
-            forms.append(
-                {url: {0: {'action': url, 'method': 'get', 'inputs': inps}}})
-        response = requester(url, params, headers, True, 0).text
-        forms.append({url: zetanize(url, response)})
-        matches = findall(
-            r'<[aA][^>]*?(href|HREF)=["\']{0,1}(.*?)["\']', response)
-        for link in matches:  # iterate over the matches
+                inps.append({'name': name, 'type': '', 'value': value})
+            forms.add(url, {'action': url, 'method': 'get', 'inputs': inps})
+        parser = PageParser(url)
+        # the page is parsed as it downloads, non-html responses are skipped
+        if streamer(url, params, headers, True, 0, parser.feed) is None:
+            stats.count('skipped pages')
+            return found
+        for form in parser.close().values():
+            forms.add(url, form)
+        for link in parser.links:  # iterate over the matches
             # remove everything after a "#" to deal with in-page anchors
-            link = link[1].split('#')[0].lstrip(' ')
+            link = link.split('#')[0].lstrip(' ')
             if link[:4] == 'http':
                 if link.startswith(main_url):
-                    storage.add(link)
+                    found.add(link)
             elif link[:2] == '//':
                 if link.split('/')[2].startswith(host):
-                    storage.add(scheme + '://' + link)
+                    found.add(scheme + '://' + link)
             elif link[:1] == '/':
-                storage.add(remove_file(url) + link)
+                found.add(remove_file(url) + link)
             else:
                 usable_url = remove_file(url)
                 if usable_url.endswith('/'):
-                    storage.add(usable_url + link)
+                    found.add(usable_url + link)
                 elif link.startswith('/'):
-                    storage.add(usable_url + link)
+                    found.add(usable_url + link)
                 else:
-                    storage.add(usable_url + '/' + link)
-    for x in range(depth):
-        urls = storage - processed
-        threadpool = concurrent.futures.ThreadPoolExecutor(max_workers=10)
-        futures = (threadpool.submit(rec, url) for url in urls)
-        for i in concurrent.futures.as_completed(futures):
-            pass
+                    found.add(usable_url + '/' + link)
+        return found
+
+    async def crawl(executor):
+        # a single frontier shared by all the workers, new links are queued
+        # as soon as they are found instead of waiting for the whole level
+        loop = asyncio.get_event_loop()
+        visit = stats.carry(rec)
+        frontier = asyncio.Queue()
+        frontier.put_nowait((seedUrl, 0))
+
+        async def worker():
+            while True:
+                url, level = await frontier.get()
+                try:
+                    links = await loop.run_in_executor(executor, visit, url)
+                except Exception:
+                    links = set()
+                for link in links:
+                    if link not in storage:
+                        storage.add(link)
+                        if level + 1 < depth:
+                            frontier.put_nowait((link, level + 1))
+                frontier.task_done()
+
+        workers = [loop.create_task(worker()) for i in range(workerCount)]
+        await frontier.join()
+        for each in workers:
+            each.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    # the concurrency controller in the request layer decides how many
+    # of these workers actually have a request in flight
+    workerCount = max(threadCount, core.config.maxConcurrency)
+    if depth > 0:
+        loop = asyncio.new_event_loop()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workerCount)
+        try:
+            loop.run_until_complete(crawl(executor))
+        finally:
+            executor.shutdown(wait=True)
+            loop.close()
     return [forms, len(processed)]
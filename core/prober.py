@@ -0,0 +1,21 @@
+def probeLength(accepted, length):
+    """Finds how many trailing characters of a token can be changed with it still
+    being accepted, accepted(count) makes a request with the last count changed"""
+    calls = [0]
+
+    def check(count):
+        calls[0] += 1
+        return accepted(count)
+
+    # changing nothing is the baseline, anything past the boundary is rejected
+    low, high = 0, length
+    while low < high:
+        middle = (low + high + 1) // 2
+        if check(middle):
+            low = middle
+        else:
+            high = middle - 1
+    # different random characters again, a dynamic response shouldn't pass as a boundary
+    if low and not check(low):
+        low = 0
+    return low, calls[0]
@@ -0,0 +1,138 @@
+import ssl
+import time
+import socket
+import threading
+import http.client
+from urllib.parse import urlparse
+
+import requests
+
+import core.config
+from core import stats
+from core.requester import getSession
+from core.limiter import throttle, getController
+
+
+def rawRequest(url, data, headers, GET):
+    """The request as it goes on the wire, with the cookies of the shared session"""
+    request = requests.Request('GET' if GET else 'POST', url, headers=headers,
+                               params=data if GET else None,
+                               data=None if GET else data)
+    prepared = getSession().prepare_request(request)
+    # one request per connection and a body that can be read as it is
+    prepared.headers['Accept-Encoding'] = 'identity'
+    prepared.headers['Connection'] = 'close'
+    parsed = urlparse(prepared.url)
+    path = (parsed.path or '/') + ('?' + parsed.query if parsed.query else '')
+    lines = ['%s %s HTTP/1.1' % (prepared.method, path), 'Host: %s' % parsed.netloc]
+    for name, value in prepared.headers.items():
+        if name.lower() != 'host':
+            lines.append('%s: %s' % (name, value))
+    body = prepared.body or b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return prepared.method, ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def connect(url):
+    parsed = urlparse(url)
+    secure = parsed.scheme == 'https'
+    sock = socket.create_connection(
+        (parsed.hostname, parsed.port or (443 if secure else 80)),
+        timeout=min(core.config.connectTimeout, core.config.timeout))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # the last byte leaves at once
+    if secure:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        sock = context.wrap_socket(sock, server_hostname=parsed.hostname)
+    sock.settimeout(core.config.timeout)
+    return sock
+
+
+def race(url, data, headers, GET, count):
+    """Sends up to count copies of a request that are released together by their last byte,
+    as many as the host is allowed to have in flight"""
+    method, payload = rawRequest(url, data, headers, GET)
+    controller = getController(url)
+    # retrying a request that lost the race would only send it on its own
+    count = controller.acquireMany(count)
+    for i in range(count):
+        throttle(url)
+    barrier = threading.Barrier(count)
+    results = []
+
+    def worker():
+        result = {'status': None, 'body': None, 'sent': None,
+                  'received': None, 'error': None}
+        results.append(result)
+        sock = None
+        try:
+            sock = connect(url)
+            sock.sendall(payload[:-1])
+        except Exception as e:
+            result['error'] = repr(e)
+        # every connection is open before any request is complete
+        try:
+            barrier.wait(core.config.timeout)
+        except threading.BrokenBarrierError:
+            pass
+        if result['error']:
+            stats.recordRequest(None, 0)
+            controller.release(time.monotonic(), False)
+            if sock:
+                sock.close()
+            return
+        started = time.monotonic()
+        healthy, latency = False, None
+        try:
+            result['sent'] = time.perf_counter()
+            sock.sendall(payload[-1:])
+            response = http.client.HTTPResponse(sock, method=method)
+            response.begin()
+            latency = time.perf_counter() - result['sent']
+            body = response.read(core.config.maxSize)
+            result['received'] = time.perf_counter()
+            result['status'] = response.status
+            stats.recordRequest(response.status, latency)
+            healthy = response.status not in (429, 503)
+            stats.count('bytes', len(body))
+            charset = response.headers.get_content_charset() or 'utf-8'
+            try:
+                result['body'] = body.decode(charset, 'replace')
+            except LookupError:
+                result['body'] = body.decode('utf-8', 'replace')
+        except Exception as e:
+            result['error'] = repr(e)
+            stats.recordRequest(None, time.perf_counter() - result['sent'])
+        finally:
+            sock.close()
+            controller.release(started, healthy, latency)
+
+    threads = [threading.Thread(target=stats.carry(worker)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def spread(results):
+    """Milliseconds between the first and the last request being released"""
+    sent = [result['sent'] for result in results if result['sent']]
+    return (max(sent) - min(sent)) * 1000 if sent else 0
+
+
+def histogram(results, buckets=8):
+    """Latencies of the answered requests as (low, high, count) buckets in milliseconds"""
+    latencies = [(result['received'] - result['sent']) * 1000
+                 for result in results if result['received']]
+    if not latencies:
+        return []
+    low = min(latencies)
+    width = (max(latencies) - low) / buckets or 1
+    counts = [0] * buckets
+    for latency in latencies:
+        counts[min(int((latency - low) / width), buckets - 1)] += 1
+    return [(low + i * width, low + (i + 1) * width, count)
+            for i, count in enumerate(counts)]
@@ -1,12 +1,72 @@
+import re
 import time
+import codecs
 import random
 import warnings
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import core.config
+from core import stats
+from core.limiter import throttle, getController
 
 warnings.filterwarnings('ignore')  # Disable SSL related warnings
 
+poolSize = 10  # connections kept alive per host
+session = None  # shared by every phase so cookies and connections persist
+sessionLock = threading.Lock()
+
+
+def setPoolSize(size):
+    global poolSize, session
+    with sessionLock:
+        poolSize = max(1, size)
+        if session:
+            session.close()
+            session = None
+
+
+def getSession():
+    global session
+    with sessionLock:
+        if not session:
+            session = requests.Session()
+            # urllib3 keeps one connection pool per host behind each adapter
+            adapter = HTTPAdapter(pool_connections=poolSize,
+                                  pool_maxsize=poolSize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        return session
+
+
+def unsent(error):
+    """True if a request failed before it could reach the server"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
 
-def requester(url, data, headers, GET, delay):
+
+def releaseOnClose(response, controller, started, healthy):
+    """Holds the slot of a streamed response until its body is done with and it is closed,
+    the controller still only sees the time until the headers arrived"""
+    close = response.close
+    released = []
+
+    def closeAndRelease():
+        try:
+            close()
+        finally:
+            if not released:
+                released.append(True)
+                controller.release(started, healthy,
+                                   response.elapsed.total_seconds())
+    response.close = closeAndRelease
+
+
+def requester(url, data, headers, GET, delay, stream=False):
     time.sleep(delay)
     user_agents = ['Mozilla/5.0 (X11; Linux i686; rv:60.0) Gecko/20100101 Firefox/60.0',
                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/60.0.3112.113 Safari/537.36'
@@ -14,9 +74,72 @@ def requester(url, data, headers, GET, delay):
     if headers:
         if 'User-Agent' not in headers:
             headers['User-Agent'] = random.choice(user_agents)
-    if GET:
-        response = requests.get(
-            url, params=data, headers=headers, verify=False)
-    else:
-        response = requests.post(url, data=data, headers=headers, verify=False)
-    return response
+    timeout = (min(core.config.connectTimeout, core.config.timeout),
+               core.config.timeout)
+    controller = getController(url)
+    attempt = 0
+    while True:
+        # the wait for the bucket is not part of the latency the controller sees
+        throttle(url)
+        started = controller.acquire()
+        sent = time.perf_counter()
+        try:
+            if GET:
+                response = getSession().get(url, params=data, headers=headers,
+                                            timeout=timeout, stream=stream, verify=False)
+            else:
+                response = getSession().post(url, data=data, headers=headers,
+                                             timeout=timeout, stream=stream, verify=False)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            controller.release(started, False)
+            stats.recordRequest(None, time.perf_counter() - sent)
+            # a form that may have been submitted once is never submitted again
+            if attempt >= core.config.retries or not (GET or unsent(e)):
+                raise
+        except Exception:
+            controller.release(started, True)
+            stats.recordRequest(None, time.perf_counter() - sent)
+            raise
+        else:
+            stats.recordRequest(response.status_code, response.elapsed.total_seconds())
+            if not stream:
+                stats.count('bytes', len(response.content))
+            healthy = response.status_code not in (429, 503)
+            # a 503 can come after the form was handled, a 429 never does
+            retry = response.status_code == 429 or (GET and not healthy)
+            if stream and (not retry or attempt >= core.config.retries):
+                releaseOnClose(response, controller, started, healthy)
+                return response
+            controller.release(started, healthy, response.elapsed.total_seconds())
+            if not retry or attempt >= core.config.retries:
+                return response
+            response.close()
+        # exponential backoff with full jitter so workers don't retry in lockstep
+        time.sleep(random.uniform(0, core.config.backoff * 2 ** attempt))
+        attempt += 1
+
+
+def streamer(url, data, headers, GET, delay, feed):
+    """Feeds the decoded body of an html response to feed() as it arrives,
+    None if the response wasn't html"""
+    response = requester(url, data, headers, GET, delay, stream=True)
+    try:
+        kind = response.headers.get('Content-Type', 'text/html')
+        if not re.search(r'(?i)html|xml', kind):
+            return None
+        try:
+            decoder = codecs.getincrementaldecoder(
+                response.encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        remaining = core.config.maxSize
+        for chunk in response.iter_content(chunk_size=16384):
+            stats.count('bytes', len(chunk))
+            feed(decoder.decode(chunk[:remaining]))
+            remaining -= len(chunk)
+            if remaining <= 0:
+                break
+        feed(decoder.decode(b'', final=True))
+    finally:
+        response.close()
+    return True
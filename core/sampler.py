@@ -0,0 +1,50 @@
+from math import exp
+
+import core.config
+
+
+def collisionPower(count, space):
+    """Chance that count tokens drawn from space values contain a repeat"""
+    return 1 - exp(-count * (count - 1) / (2.0 * space))
+
+
+class Sampler:
+    """Collects fresh tokens in batches until the checks have enough of them"""
+
+    def __init__(self, burst, accumulator=None):
+        self.burst = burst  # url, count -> tokens of each simultaneous request made, up to count
+        self.accumulator = accumulator
+        self.tokens = []  # distinct tokens, in the order they were issued
+        self.seen = set()
+        self.collisions = 0  # tokens that were issued more than once
+        self.requests = 0
+
+    def enough(self):
+        if self.collisions:
+            return True
+        if self.accumulator and self.accumulator.verdict() == 'non-random':
+            return True
+        powered = collisionPower(len(self.tokens), core.config.collisionSpace)
+        # the full battery runs on every token later, sampling only feeds it
+        bits = self.accumulator.n if self.accumulator else core.config.sampleBits
+        return powered >= core.config.power and bits >= core.config.sampleBits
+
+    def record(self, tokens):
+        for token in tokens:
+            if token in self.seen:
+                self.collisions += 1
+            else:
+                self.seen.add(token)
+                self.tokens.append(token)
+                if self.accumulator:
+                    self.accumulator.add(token)
+
+    def sample(self, url, budget=None):
+        budget = budget or core.config.sampleBudget
+        while self.requests < budget and not self.enough():
+            count = min(core.config.sampleBatch, budget - self.requests)
+            batch = self.burst(url, count)
+            for tokens in batch:
+                self.record(tokens)
+            self.requests += len(batch)
+        return self.tokens
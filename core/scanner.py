@@ -0,0 +1,181 @@
+import re
+import random
+import statistics
+
+import core.config
+from core.photon import photon
+from core.evaluate import evaluate
+from core.hashes import hashTypes
+from core.database import TokenDatabase
+from core.ranger import ranger
+from core.zetanize import zetanize
+from core.substrings import commonSubstrings
+from core.encoder import encodeTokens
+from core.accumulator import Accumulator
+from core.sampler import Sampler
+from core.racer import race, spread, histogram
+from core.scheduler import schedule
+from core.limiter import setConcurrency, settled
+from core.utils import strength
+from core import stats
+from core.stats import phase, timed
+
+
+def extractTokens(url, response):
+    """Distinct token-like values of every form in a response"""
+    forms = zetanize(url, response)
+    tokens = []
+    for each in forms.values():
+        inputs = each['inputs']
+        for inp in inputs:
+            value = inp['value']
+            if value and re.match(r'^[\w\-_]+$', value):
+                # a token shared by forms of a page was issued only once
+                if strength(value) > 10 and value not in tokens:
+                    tokens.append(value)
+    return tokens
+
+
+class Result:
+    """Findings of a scan, filled in as the phases run"""
+
+    def __init__(self, target):
+        self.target = target
+        self.urls = 0  # urls that were crawled
+        self.forms = 0  # distinct forms found
+        self.weakTokens = []
+        self.insecureForms = []
+        self.replays = {}
+        self.tokens = 0
+        self.hashTypes = []  # (hash type, tokens it matches), most common first
+        self.similarity = None
+        self.commonSubstrings = {}
+        self.streaming = None  # verdict of the running tests
+        self.sample = None
+        self.tests = []
+        self.randomness = {}
+        self.stopped = None  # why the scan ended before the last phase
+
+    def toDict(self):
+        return dict(vars(self))
+
+
+class Scanner:
+    """Runs the phases of a scan against one target, one method per phase"""
+
+    phases = ['crawl', 'evaluate', 'compare', 'observe', 'test', 'analyse']
+
+    def __init__(self, target, headers=None, level=2, threadCount=None,
+                 encoding='auto', budget=None):
+        self.target = target
+        self.headers = dict(headers or core.config.headers)
+        self.level = level
+        if threadCount:
+            # only the limit of the target's host changes, other hosts keep theirs
+            setConcurrency(threadCount, target)
+        self.encoding = encoding
+        self.budget = budget
+        self.accumulator = Accumulator(encoding)
+        self.database = TokenDatabase(self.accumulator)
+        self.forms = None
+        self.sampler = None
+        self.raced = []  # every raced request, for the latency histogram
+        self.spreads = []
+        self.result = Result(target)
+
+    @phase
+    def crawl(self):
+        self.forms, count = photon(self.target, self.headers,
+                                   self.level, settled(self.target))
+        self.result.urls = count
+        self.result.forms = len(self.forms)
+        return True
+
+    @phase
+    def evaluate(self):
+        evaluate(self.forms, self.database)
+        self.result.weakTokens = self.database.weakTokens
+        self.result.insecureForms = self.database.insecureForms
+        return True
+
+    @phase
+    def compare(self):
+        result = self.result
+        tokens = self.database.tokens
+        result.replays = self.database.replays()
+        result.tokens = len(set(tokens))  # distinct tokens
+        if not tokens:
+            result.stopped = 'No CSRF protection to test'
+            return False
+        from core.similarity import similarity
+        with timed('hashTypes'):
+            result.hashTypes = hashTypes(tokens).most_common()
+        try:
+            with timed('similarity'):
+                score, error = similarity(tokens)
+        except statistics.StatisticsError:
+            result.stopped = 'No CSRF protection to test'
+            return False
+        result.similarity = {'score': score, 'error': error}
+        with timed('commonSubstrings'):
+            result.commonSubstrings = commonSubstrings(tokens)
+        result.streaming = self.streaming()
+        return True
+
+    def streaming(self):
+        weakest, pvalue = self.accumulator.weakest()
+        return {'verdict': self.accumulator.verdict(), 'bits': self.accumulator.n,
+                'test': weakest, 'pvalue': pvalue}
+
+    def raceForms(self, url, count):
+        results = race(url, {}, self.headers, True, count)
+        self.raced.extend(results)
+        self.spreads.append(spread(results))
+        return [extractTokens(url, result['body']) if result['body'] is not None else []
+                for result in results]
+
+    @phase
+    def observe(self):
+        candidate = random.choice(
+            [url for url, tokens in self.database.pages.items() if tokens])
+        self.sampler = Sampler(self.raceForms, self.accumulator)
+        self.sampler.sample(candidate, self.budget)
+        self.result.sample = {
+            'url': candidate,
+            'requests': self.sampler.requests,
+            'tokens': len(self.sampler.tokens),
+            'collisions': self.sampler.collisions,
+            'spread': max(self.spreads) if self.spreads else None,
+            'histogram': histogram(self.raced),
+        }
+        return True
+
+    @phase
+    def test(self):
+        tests = schedule(self.forms, self.headers, ranger(self.database.tokens))
+        self.result.tests = [test.report() for test in tests]
+        if not tests:
+            self.result.stopped = 'No suitable form found for testing.'
+            return False
+        return True
+
+    @phase
+    def analyse(self):
+        from core.entropy import isRandom
+        self.result.streaming = self.streaming()
+        tokens = self.database.tokens + (self.sampler.tokens if self.sampler else [])
+        with timed('encodeTokens'):
+            binary = encodeTokens(tokens, self.encoding)
+        with timed('isRandom'):
+            self.result.randomness = isRandom(binary)
+            # the tests run in processes of their own
+            stats.addCpu(sum(outcome['cpu'] or 0 for outcome in self.result.randomness.values()))
+        stats.count('bits tested', len(binary) * 8)
+        return True
+
+    def run(self):
+        """Runs every phase in order until one of them has nothing to go on"""
+        for name in self.phases:
+            if not getattr(self, name)():
+                break
+        return self.result
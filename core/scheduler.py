@@ -0,0 +1,112 @@
+import concurrent.futures
+import re
+
+import core.config
+from core import stats
+from core.baseline import Baseline, observe
+from core.datanize import datanize
+from core.prober import probeLength
+from core.requester import requester, streamer
+from core.tweaker import tweaker
+from core.utils import isProtected
+from core.zetanize import FormParser
+
+mobileAgent = 'Mozilla/4.0 (compatible; MSIE 5.5; Windows CE; PPC; 240x320)'
+
+
+class FormTest:
+    """The tamper cases of one protected form and what came of them"""
+
+    cases = ['mobile', 'remove', 'clear', 'generate', 'probe']
+
+    def __init__(self, page, GET, url, data, headers, seeds):
+        self.page = page  # url the form was found on
+        self.GET = GET
+        self.url = url
+        self.data = data
+        self.headers = headers
+        self.seeds = seeds
+        self.baseline = Baseline()  # fingerprints of untouched requests
+        self.verdicts = {}  # case -> what the case found
+        self.errors = {}  # case -> why it couldn't run
+
+    def request(self, data):
+        """(status code, length, fingerprint) of the response"""
+        return observe(requester(self.url, data, dict(self.headers),
+                                 self.GET, 0, stream=True))
+
+    def untouched(self):
+        return self.request(self.data)
+
+    def accepted(self, data):
+        return self.baseline.matches(*self.request(data))
+
+    def mobile(self):
+        """True if the page has no protection when it's opened on a mobile"""
+        headers = dict(self.headers)
+        headers['User-Agent'] = mobileAgent
+        parser = FormParser(self.page)
+        streamer(self.page, {}, headers, True, 0, parser.feed)
+        return not isProtected(parser.close())
+
+    def remove(self):
+        return self.accepted(tweaker(self.data, 'remove'))
+
+    def clear(self):
+        return self.accepted(tweaker(self.data, 'clear'))
+
+    def generate(self):
+        return self.accepted(tweaker(self.data, 'generate', seeds=self.seeds))
+
+    def report(self):
+        """What was found, as plain data"""
+        baseline = None
+        if self.baseline.hashes:
+            baseline = {'codes': sorted(self.baseline.codes),
+                        'lengths': [min(self.baseline.lengths), max(self.baseline.lengths)],
+                        'dynamic': self.baseline.dynamic()}
+        return {'page': self.page, 'url': self.url,
+                'method': 'GET' if self.GET else 'POST', 'baseline': baseline,
+                'verdicts': dict(self.verdicts), 'errors': dict(self.errors)}
+
+    def probe(self):
+        """(trailing characters that aren't checked, requests it took)"""
+        length = max((len(value) for value in self.data.values()
+                      if re.match(core.config.tokenPattern, value)), default=0)
+        return probeLength(lambda count: self.accepted(
+            tweaker(self.data, 'replace', index=count, seeds=self.seeds)), length)
+
+
+def schedule(entries, headers, seeds):
+    """Runs the tamper cases of every protected form at once"""
+    tests = []
+    for entry in entries:
+        parsed = datanize({0: entry['form']}, tolerate=True)
+        if parsed:
+            tests.append(FormTest(next(iter(entry['urls'])), parsed[0],
+                                  parsed[1], parsed[2], headers, seeds))
+    # the controller in the request layer keeps each host within its limits
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=core.config.maxConcurrency) as executor:
+        # untouched requests per form, they also tell how dynamic it is
+        jobs = {executor.submit(stats.carry(test.untouched)): test
+                for test in tests for i in range(core.config.baselineSamples)}
+        for future in concurrent.futures.as_completed(jobs):
+            try:
+                jobs[future].baseline.add(*future.result())
+            except Exception as e:
+                jobs[future].errors['baseline'] = repr(e)
+        ready = []
+        for test in tests:
+            if test.baseline.hashes:
+                test.errors.pop('baseline', None)
+                ready.append(test)
+        jobs = {executor.submit(stats.carry(getattr(test, case))): (test, case)
+                for test in ready for case in FormTest.cases}
+        for future in concurrent.futures.as_completed(jobs):
+            test, case = jobs[future]
+            try:
+                test.verdicts[case] = future.result()
+            except Exception as e:
+                test.errors[case] = repr(e)
+    return tests
@@ -0,0 +1,86 @@
+import heapq
+import math
+import random
+import statistics
+from multiprocessing import cpu_count
+
+from fuzzywuzzy import fuzz, utils
+
+import core.config
+from core.utils import processContext
+
+closest = 5  # matches averaged for every token, same as process.extract
+
+
+def partialRatio(s1, s2):
+    """fuzz.partial_ratio straight on top of the Levenshtein C extension"""
+    if s1 == s2:
+        return 100
+    if not s1 or not s2:
+        return 0
+    if len(s1) <= len(s2):
+        shorter, longer = s1, s2
+    else:
+        shorter, longer = s2, s1
+    best = 0
+    blocks = matching_blocks(editops(shorter, longer), shorter, longer)
+    for block in blocks:
+        start = max(0, block[1] - block[0])
+        score = ratio(shorter, longer[start:start + len(shorter)])
+        if score > .995:
+            return 100
+        best = max(best, score)
+    return int(round(100 * best))
+
+
+try:
+    from Levenshtein import editops, matching_blocks, ratio
+except ImportError:
+    partialRatio = fuzz.partial_ratio  # noqa: F811
+
+
+def scoreRows(rows, processed):
+    """Average score of each row against its closest matches, self excluded"""
+    averages = []
+    for row in rows:
+        query = processed[row]
+        scores = heapq.nlargest(
+            closest, (partialRatio(query, choice) for choice in processed))
+        if 100 in scores:
+            scores.remove(100)
+        averages.append(statistics.mean(scores))
+    return averages
+
+
+def scoreMatrix(rows, processed):
+    """Scores the rows in batches, spread over processes for large inputs"""
+    workers = cpu_count()
+    if workers < 2 or len(rows) * len(processed) < 50000:
+        return scoreRows(rows, processed)
+    size = math.ceil(len(rows) / (workers * 4))
+    batches = [rows[i:i + size] for i in range(0, len(rows), size)]
+    averages = []
+    pool = processContext().Pool(workers)
+    try:
+        for result in pool.starmap(scoreRows, [(batch, processed) for batch in batches]):
+            averages.extend(result)
+    finally:
+        pool.terminate()
+        pool.join()
+    return averages
+
+
+def similarity(tokens):
+    """Returns average similarity of tokens and its 95% error bound"""
+    if len(tokens) < 2:
+        raise statistics.StatisticsError('at least two tokens are required')
+    processed = [utils.full_process(token) for token in tokens]
+    count = len(tokens)
+    if count <= core.config.similarityLimit:
+        return statistics.mean(scoreMatrix(list(range(count)), processed)), 0
+    sample = random.sample(range(count), core.config.similaritySample)
+    averages = scoreMatrix(sample, processed)
+    # finite population correction as rows are sampled without replacement
+    error = 1.96 * statistics.stdev(averages) / math.sqrt(len(sample)) * \
+        math.sqrt((count - len(sample)) / (count - 1))
+    return statistics.mean(averages), error
@@ -0,0 +1,156 @@
+import os
+import time
+import threading
+from functools import wraps
+from collections import Counter
+from contextlib import contextmanager
+
+lock = threading.Lock()
+local = threading.local()  # phase and open timers of the scan running in a thread
+timings = {}  # name -> [wall seconds, cpu seconds, calls]
+requests = Counter()  # phase -> requests made
+statuses = Counter()  # status code or 'error' -> responses
+latencies = []  # seconds until the response headers arrived
+counters = Counter()  # bytes, pages and anything else worth counting
+# thread_time came with python 3.7, before it cpu time can only be told per process
+perThread = hasattr(time, 'thread_time')
+cpuTime = time.thread_time if perThread else time.process_time
+
+
+def reset():
+    with lock:
+        timings.clear()
+        requests.clear()
+        statuses.clear()
+        del latencies[:]
+        counters.clear()
+
+
+def addCpu(seconds, names=None):
+    """Charges cpu time spent elsewhere to the timers open in this thread"""
+    with lock:
+        for name in getattr(local, 'timers', []) if names is None else names:
+            timings.setdefault(name, [0.0, 0.0, 0])[1] += seconds
+
+
+@contextmanager
+def timed(name, isPhase=False):
+    """Adds the wall time of a block and the cpu time of this thread to name"""
+    phase, timers = getattr(local, 'phase', None), getattr(local, 'timers', [])
+    if isPhase:
+        local.phase = name
+    local.timers = timers + [name]
+    wall, cpu = time.perf_counter(), cpuTime()
+    try:
+        yield
+    finally:
+        local.phase, local.timers = phase, timers
+        with lock:
+            entry = timings.setdefault(name, [0.0, 0.0, 0])
+            entry[0] += time.perf_counter() - wall
+            entry[1] += cpuTime() - cpu
+            entry[2] += 1
+
+
+def carry(function):
+    """function, set to count its requests and cpu time against the caller's phase
+    when it runs in another thread"""
+    phase, timers = getattr(local, 'phase', None), list(getattr(local, 'timers', []))
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        previous = getattr(local, 'phase', None), getattr(local, 'timers', [])
+        local.phase, local.timers = phase, []
+        cpu = cpuTime()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if perThread:  # the caller's process time already has it otherwise
+                addCpu(cpuTime() - cpu, timers)
+            local.phase, local.timers = previous
+    return wrapper
+
+
+def phase(method):
+    """Times a phase of the scanner and counts its requests against it"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with timed(method.__name__, True):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def recordRequest(status, latency):
+    with lock:
+        requests[getattr(local, 'phase', None) or 'other'] += 1
+        statuses[str(status) if status else 'error'] += 1
+        latencies.append(latency)
+
+
+def count(name, value=1):
+    with lock:
+        counters[name] += value
+
+
+def percentile(values, fraction):
+    """Nearest rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+def summary():
+    with lock:
+        ordered = sorted(latencies)
+        return {
+            'timings': {name: {'wall': wall, 'cpu': cpu, 'calls': calls}
+                        for name, (wall, cpu, calls) in timings.items()},
+            'requests': sum(requests.values()),
+            'requestsByPhase': dict(requests),
+            'statuses': dict(statuses),
+            'bytes': counters['bytes'],
+            'counters': dict(counters),
+            'latency': {'p50': percentile(ordered, 0.5), 'p90': percentile(ordered, 0.9),
+                        'p99': percentile(ordered, 0.99),
+                        'max': ordered[-1] if ordered else None},
+        }
+
+
+def prometheus():
+    """The metrics in the text format of the prometheus node exporter"""
+    stats = summary()
+    lines = ['# HELP bolt_seconds_total Time spent in every phase and analysis.',
+             '# TYPE bolt_seconds_total counter']
+    for name, timing in sorted(stats['timings'].items()):
+        for clock in ('wall', 'cpu'):
+            lines.append('bolt_seconds_total{name="%s",clock="%s"} %f' %
+                         (name, clock, timing[clock]))
+    lines += ['# HELP bolt_requests_total Requests made in every phase.',
+              '# TYPE bolt_requests_total counter']
+    for name, value in sorted(stats['requestsByPhase'].items()):
+        lines.append('bolt_requests_total{phase="%s"} %i' % (name, value))
+    lines += ['# HELP bolt_responses_total Responses by status code.',
+              '# TYPE bolt_responses_total counter']
+    for status, value in sorted(stats['statuses'].items()):
+        lines.append('bolt_responses_total{status="%s"} %i' % (status, value))
+    lines += ['# HELP bolt_response_bytes_total Bytes of response bodies read.',
+              '# TYPE bolt_response_bytes_total counter',
+              'bolt_response_bytes_total %i' % stats['bytes'],
+              '# HELP bolt_latency_seconds Time until the response headers arrived.',
+              '# TYPE bolt_latency_seconds summary']
+    for quantile, key in (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99')):
+        if stats['latency'][key] is not None:
+            lines.append('bolt_latency_seconds{quantile="%s"} %f' %
+                         (quantile, stats['latency'][key]))
+    with lock:
+        lines.append('bolt_latency_seconds_sum %f' % sum(latencies))
+        lines.append('bolt_latency_seconds_count %i' % len(latencies))
+    return '\n'.join(lines) + '\n'
+
+
+def writeTextfile(path):
+    """Replaces path at once so the textfile collector never reads half a file"""
+    temporary = '%s.%i.tmp' % (path, os.getpid())
+    with open(temporary, 'w') as textfile:
+        textfile.write(prometheus())
+    os.replace(temporary, path)
@@ -0,0 +1,108 @@
+class Automaton:
+    """Generalized suffix automaton of a list of strings
+
+    Each state stands for a set of substrings sharing their end positions,
+    mask has a bit set for every string that contains them.
+    """
+
+    def __init__(self, strings):
+        self.link = [-1]
+        self.length = [0]
+        self.trans = [{}]
+        self.mask = [0]
+        self.end = [(0, 0)]  # a string and position where a state ends
+        for index, string in enumerate(strings):
+            last = 0
+            for position, char in enumerate(string):
+                last = self.extend(last, char, (index, position + 1))
+                self.mask[last] |= 1 << index
+        # a substring is found in every string any of its extensions is in
+        for state in sorted(range(1, len(self.length)),
+                            key=self.length.__getitem__, reverse=True):
+            self.mask[self.link[state]] |= self.mask[state]
+
+    def segment(self, state, strings):
+        index, end = self.end[state]
+        return strings[index][end - self.length[state]:end]
+
+    def newState(self, length, trans, link, end):
+        self.length.append(length)
+        self.trans.append(trans)
+        self.link.append(link)
+        self.mask.append(0)
+        self.end.append(end)
+        return len(self.length) - 1
+
+    def split(self, parent, char, child):
+        clone = self.newState(self.length[parent] + 1, dict(self.trans[child]),
+                              self.link[child], self.end[child])
+        while parent != -1 and self.trans[parent].get(char) == child:
+            self.trans[parent][char] = clone
+            parent = self.link[parent]
+        self.link[child] = clone
+        return clone
+
+    def extend(self, last, char, end):
+        if char in self.trans[last]:  # seen before in an earlier string
+            child = self.trans[last][char]
+            if self.length[last] + 1 == self.length[child]:
+                return child
+            return self.split(last, char, child)
+        current = self.newState(self.length[last] + 1, {}, 0, end)
+        parent = last
+        while parent != -1 and char not in self.trans[parent]:
+            self.trans[parent][char] = current
+            parent = self.link[parent]
+        if parent != -1:
+            child = self.trans[parent][char]
+            if self.length[parent] + 1 == self.length[child]:
+                self.link[current] = child
+            else:
+                self.link[current] = self.split(parent, char, child)
+        return current
+
+
+def bits(mask):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def positions(string, sub):
+    found = []
+    start = string.find(sub)
+    while start != -1:
+        found.append(start)
+        start = string.find(sub, start + 1)
+    return found
+
+
+def commonSubstrings(tokens, minLength=3):
+    """Static segments shared by tokens along with where they occur"""
+    strings = sorted(set(tokens))
+    automaton = Automaton(strings)
+    groups = {}  # segments grouped by the strings containing them
+    for state in range(1, len(automaton.length)):
+        mask = automaton.mask[state]
+        if automaton.length[state] < minLength or not mask & (mask - 1):
+            continue
+        # skip segments that extend to the right without losing a string
+        if any(automaton.mask[child] == mask
+               for child in automaton.trans[state].values()):
+            continue
+        groups.setdefault(mask, []).append(state)
+    result = {}
+    for mask, states in groups.items():
+        owners = [strings[index] for index in bits(mask)]
+        segments = []
+        for state in sorted(states, key=automaton.length.__getitem__,
+                            reverse=True):
+            segment = automaton.segment(state, strings)
+            # shorter segments found in exactly the same strings are redundant
+            if not any(segment in longer for longer in segments):
+                segments.append(segment)
+        for segment in segments:
+            result[segment] = {string: positions(string, segment)
+                               for string in owners}
+    return result
@@ -39,7 +39,13 @@ def tweaker(data, strategy, index=0, seeds=[None, None]):
             else:
                 newData[name] = value
     elif strategy == 'replace':
+        pool = digits + alphabets or list('0123456789abcdef')
         for name, value in data.items():
             if re.match(tokenPattern, value):
-                value
+                kept = max(0, len(value) - index)
+                # every replaced character is different from the original one
+                value = value[:kept] + ''.join(
+                    random.choice([c for c in pool if c != char] or ['0' if char != '0' else '1'])
+                    for char in value[kept:])
+            newData[name] = value
     return newData
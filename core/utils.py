@@ -1,24 +1,20 @@
 import re
+import threading
+import multiprocessing
 from core.config import tokenPattern
 
 
-def longestCommonSubstring(s1, s2):
-    m = [[0] * (1 + len(s2)) for i in range(1 + len(s1))]
-    longest, x_longest = 0, 0
-    for x in range(1, 1 + len(s1)):
-        for y in range(1, 1 + len(s2)):
-            if s1[x - 1] == s2[y - 1]:
-                m[x][y] = m[x - 1][y - 1] + 1
-                if m[x][y] > longest:
-                    longest = m[x][y]
-                    x_longest = x
-            else:
-                m[x][y] = 0
-    return s1[x_longest - longest: x_longest]
-
-
-def stringToBinary(string):
-    return ''.join(format(ord(x), 'b') for x in string)
+def processContext():
+    """Starts worker processes from a clean process when other threads are running,
+    forking while they hold locks can leave the children waiting on them forever"""
+    if threading.active_count() == 1:
+        return multiprocessing.get_context()
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # the server imports these once instead of every worker
+        context.set_forkserver_preload(['core.entropy', 'core.similarity'])
+        return context
+    return multiprocessing.get_context('spawn')
 
 
 def strength(string):
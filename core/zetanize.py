@@ -1,51 +1,89 @@
-import re
+from html.parser import HTMLParser
 from urllib.parse import urlparse
 
 
+class FormParser(HTMLParser):
+    """Collects forms and the fields they enclose in a single pass"""
+
+    def __init__(self, url):
+        super().__init__(convert_charrefs=True)
+        parsedUrl = urlparse(url)
+        self.url = url
+        self.mainUrl = parsedUrl.scheme + '://' + parsedUrl.netloc
+        self.forms = {}
+        self.form = None  # form being parsed
+        self.select = None  # select being parsed
+        self.textarea = None  # textarea being parsed
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        if tag == 'form':
+            action = attrs.get('action', self.url)
+            if not action.startswith('http'):
+                if action.startswith('/'):
+                    action = self.mainUrl + action
+                else:
+                    action = self.mainUrl + '/' + action
+            self.form = {
+                'action': action,
+                'method': attrs.get('method', 'get').lower() or 'get',
+                'inputs': []
+            }
+            self.forms[len(self.forms)] = self.form
+        elif self.form is None:
+            return
+        elif tag == 'option' and self.select is not None:
+            value = attrs.get('value', '')
+            if 'selected' in attrs:
+                self.select['value'] = value
+                self.select['selected'] = True
+            elif not self.select['value'] and not self.select['selected']:
+                self.select['value'] = value
+        elif 'name' not in attrs:
+            return
+        elif tag == 'input':
+            inpType = attrs.get('type', '')
+            inpValue = attrs.get('value', '')
+            if inpType.lower() == 'submit' and inpValue == '':
+                inpValue = 'Submit Query'
+            self.addInput(attrs['name'], inpType, inpValue)
+        elif tag == 'select':
+            self.select = self.addInput(attrs['name'], 'select', '')
+            self.select['selected'] = False
+        elif tag == 'textarea':
+            self.textarea = self.addInput(attrs['name'], 'textarea', '')
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self.form = self.select = self.textarea = None
+        elif tag == 'select' and self.select is not None:
+            del self.select['selected']
+            self.select = None
+        elif tag == 'textarea':
+            self.textarea = None
+
+    def handle_data(self, data):
+        if self.textarea is not None:
+            self.textarea['value'] += data
+
+    def addInput(self, name, kind, value):
+        inpDict = {
+            'name': name,
+            'type': kind,
+            'value': value
+        }
+        self.form['inputs'].append(inpDict)
+        return inpDict
+
+    def close(self):
+        super().close()
+        if self.select is not None:
+            del self.select['selected']
+            self.select = None
+        return self.forms
+
+
 def zetanize(url, response):
-    parsedUrl = urlparse(url)
-    mainUrl = parsedUrl.scheme + '://' + parsedUrl.netloc
-
-    def e(string):
-        return string.encode('utf-8')
-
-    def d(string):
-        return string.decode('utf-8')
-
-    response = re.sub(r'(?s)<!--.*?-->', '', response)
-    forms = {}
-    matches = re.findall(r'(?i)(?s)<form.*?</form.*?>', response)
-    num = 0
-    for match in matches:
-        page = re.search(r'(?i)action=[\'"](.*?)[\'"]', match)
-        method = re.search(r'(?i)method=[\'"](.*?)[\'"]', match)
-        forms[num] = {}
-        action = d(e(page.group(1)))
-        if not action.startswith('http'):
-            if action.startswith('/'):
-                action = mainUrl + action
-            else:
-                action = mainUrl + '/' + action
-        forms[num]['action'] = action.replace('&amp;', '&') if page else ''
-        forms[num]['method'] = d(
-            e(method.group(1)).lower()) if method else 'get'
-        forms[num]['inputs'] = []
-        inputs = re.findall(r'(?i)(?s)<input.*?>', response)
-        for inp in inputs:
-            inpName = re.search(r'(?i)name=[\'"](.*?)[\'"]', inp)
-            if inpName:
-                inpType = re.search(r'(?i)type=[\'"](.*?)[\'"]', inp)
-                inpValue = re.search(r'(?i)value=[\'"](.*?)[\'"]', inp)
-                inpName = d(e(inpName.group(1)))
-                inpType = d(e(inpType.group(1)))if inpType else ''
-                inpValue = d(e(inpValue.group(1))) if inpValue else ''
-                if inpType.lower() == 'submit' and inpValue == '':
-                    inpValue = 'Submit Query'
-                inpDict = {
-                    'name': inpName,
-                    'type': inpType,
-                    'value': inpValue
-                }
-                forms[num]['inputs'].append(inpDict)
-        num += 1
-    return forms
+    parser = FormParser(url)
+    parser.feed(response)
+    return parser.close()